@@ -0,0 +1,129 @@
+"""Non-blocking logging setup."""
+import copy
+import json
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Tuple
+
+from config.settings import settings
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line."""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        """Format a record as JSON."""
+        data = {
+            'time': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data['exc_info'] = record.exc_text
+        return json.dumps(data, ensure_ascii=False)
+
+
+class StructuredQueueHandler(QueueHandler):
+    """Queue handler that keeps the traceback separate from the message."""
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Merge args and render the traceback before the record is queued."""
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Limit how many records each call site may log per minute.
+
+    Records are keyed by the source line that logged them, so a hot
+    ``logger.info`` inside a loop is throttled without affecting other
+    messages. Warnings and errors always pass. When a call site's window
+    rolls over, the number of dropped records is appended to the next
+    record that passes.
+    """
+    
+    def __init__(self, max_per_minute: int):
+        """Initialize filter with a per-call-site limit."""
+        super().__init__()
+        self.max_per_minute = max_per_minute
+        self._windows: Dict[Tuple[str, int], list] = {}
+        self._lock = threading.Lock()
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Decide whether a record is logged."""
+        if record.levelno >= logging.WARNING:
+            return True
+        
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= 60:
+                suppressed = window[2] if window else 0
+                self._windows[key] = [now, 1, 0]
+                if suppressed:
+                    record.msg = f"{record.getMessage()} ({suppressed} similar messages suppressed)"
+                    record.args = None
+                return True
+            
+            if window[1] < self.max_per_minute:
+                window[1] += 1
+                return True
+            
+            window[2] += 1
+            return False
+
+
+def setup_logging() -> QueueListener:
+    """
+    Route all logging through a queue to a background listener thread.
+
+    The root logger only gets a ``QueueHandler``; file writes, rotation and
+    console output happen on the listener thread, so logging never blocks
+    the event loop.
+
+    Returns:
+        The started listener (stop it on shutdown to flush remaining records)
+    """
+    if settings.LOG_FORMAT.lower() == 'json':
+        formatter: logging.Formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(TEXT_FORMAT)
+    
+    file_handler = RotatingFileHandler(
+        'bot.log',
+        maxBytes=10*1024*1024,  # 10MB
+        backupCount=5  # Keep 5 old logs
+    )
+    stream_handler = logging.StreamHandler()
+    for handler in (file_handler, stream_handler):
+        handler.setFormatter(formatter)
+    
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = StructuredQueueHandler(log_queue)
+    if settings.LOG_RATE_LIMIT_PER_MINUTE > 0:
+        queue_handler.addFilter(RateLimitFilter(settings.LOG_RATE_LIMIT_PER_MINUTE))
+    
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(getattr(logging, settings.LOG_LEVEL))
+    
+    listener = QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+    listener.start()
+    return listener
@@ -1,5 +1,6 @@
 """Application settings loaded from environment variables."""
 import os
+from typing import List
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -12,32 +13,98 @@ class Settings:
     # Telegram Bot
     TELEGRAM_BOT_TOKEN: str = os.getenv('TELEGRAM_BOT_TOKEN', '')
     
+    # Maximum number of updates handled at the same time
+    BOT_MAX_CONCURRENT_UPDATES: int = int(os.getenv('BOT_MAX_CONCURRENT_UPDATES', '8'))
+    
+    # Seconds before a user's cached creator list is reloaded from the database
+    CREATOR_CACHE_TTL_SECONDS: int = int(os.getenv('CREATOR_CACHE_TTL_SECONDS', '300'))
+    
     # Supabase
     SUPABASE_URL: str = os.getenv('SUPABASE_URL', '')
     SUPABASE_KEY: str = os.getenv('SUPABASE_KEY', '')
     
+    # Database backend: 'supabase' (REST) or 'postgres' (direct asyncpg connection)
+    DATABASE_BACKEND: str = os.getenv('DATABASE_BACKEND', 'supabase')
+    DATABASE_URL: str = os.getenv('DATABASE_URL', '')
+    DATABASE_POOL_MIN_SIZE: int = int(os.getenv('DATABASE_POOL_MIN_SIZE', '1'))
+    DATABASE_POOL_MAX_SIZE: int = int(os.getenv('DATABASE_POOL_MAX_SIZE', '10'))
+    
+    # Local store (SQLite write-through cache in front of Supabase; empty path disables it)
+    LOCAL_STORE_PATH: str = os.getenv('LOCAL_STORE_PATH', 'local_state.db')
+    LOCAL_STORE_SYNC_SECONDS: int = int(os.getenv('LOCAL_STORE_SYNC_SECONDS', '5'))
+    LOCAL_STORE_REFRESH_MINUTES: int = int(os.getenv('LOCAL_STORE_REFRESH_MINUTES', '10'))
+    
     # Monitoring
     MONITOR_INTERVAL_MINUTES: int = int(os.getenv('MONITOR_INTERVAL_MINUTES', '10'))
     MAX_POSTS_PER_CHECK: int = int(os.getenv('MAX_POSTS_PER_CHECK', '5'))
+    # Max creator checks per interval, shared fairly between users (0 = unlimited)
+    SCRAPE_BUDGET_PER_INTERVAL: int = int(os.getenv('SCRAPE_BUDGET_PER_INTERVAL', '0'))
+    # Max creators each user can track (0 = unlimited)
+    MAX_CREATORS_PER_USER: int = int(os.getenv('MAX_CREATORS_PER_USER', '0'))
+    # Accounts checked at the same time when adding many creators (/add a b c, /import)
+    IMPORT_VALIDATE_CONCURRENCY: int = int(os.getenv('IMPORT_VALIDATE_CONCURRENCY', '4'))
+    # Seconds between checkpoints of the per-creator schedule (also saved on shutdown)
+    SCHEDULER_CHECKPOINT_SECONDS: int = int(os.getenv('SCHEDULER_CHECKPOINT_SECONDS', '60'))
+    
+    # Monitoring pipeline (fetch → diff → persist → notify)
+    PIPELINE_FETCH_WORKERS: int = int(os.getenv('PIPELINE_FETCH_WORKERS', '1'))
+    PIPELINE_DIFF_BATCH_SIZE: int = int(os.getenv('PIPELINE_DIFF_BATCH_SIZE', '10'))
+    PIPELINE_PERSIST_BATCH_SIZE: int = int(os.getenv('PIPELINE_PERSIST_BATCH_SIZE', '10'))
+    PIPELINE_NOTIFY_WORKERS: int = int(os.getenv('PIPELINE_NOTIFY_WORKERS', '4'))
+    # Max items waiting between two stages
+    PIPELINE_QUEUE_SIZE: int = int(os.getenv('PIPELINE_QUEUE_SIZE', '20'))
+    
+    # Hashtags kept per time bucket by the trending counters (bounds memory)
+    TRENDING_SKETCH_SIZE: int = int(os.getenv('TRENDING_SKETCH_SIZE', '200'))
     
     # Alert settings
     ALERT_ONLY_RECENT_POSTS: bool = os.getenv('ALERT_ONLY_RECENT_POSTS', 'true').lower() == 'true'
+    # Digest window in seconds (0 = one digest per monitoring cycle)
+    ALERT_DIGEST_WINDOW_SECONDS: int = int(os.getenv('ALERT_DIGEST_WINDOW_SECONDS', '0'))
     
     # Logging
     LOG_LEVEL: str = os.getenv('LOG_LEVEL', 'INFO')
+    # 'text' or 'json' (one JSON object per line)
+    LOG_FORMAT: str = os.getenv('LOG_FORMAT', 'text')
+    # Max INFO/DEBUG records per call site per minute (0 = unlimited)
+    LOG_RATE_LIMIT_PER_MINUTE: int = int(os.getenv('LOG_RATE_LIMIT_PER_MINUTE', '120'))
     
     # TikTok Scraper
     TIKTOK_REQUEST_DELAY: int = int(os.getenv('TIKTOK_REQUEST_DELAY', '2'))
     TIKTOK_MAX_RETRIES: int = int(os.getenv('TIKTOK_MAX_RETRIES', '3'))
+    # Deadline of a single fetch in seconds (0 = none)
+    TIKTOK_REQUEST_TIMEOUT: int = int(os.getenv('TIKTOK_REQUEST_TIMEOUT', '60'))
+    # Send a second request when a fetch is slower than the recent p95
+    TIKTOK_HEDGE_REQUESTS: bool = os.getenv('TIKTOK_HEDGE_REQUESTS', 'false').lower() == 'true'
+    # yt-dlp extractions running at the same time (own thread pool, apart from database calls)
+    TIKTOK_MAX_EXTRACTIONS: int = int(os.getenv('TIKTOK_MAX_EXTRACTIONS', '8'))
+    
+    # Proxy pool (comma-separated proxy URLs; empty = connect directly)
+    TIKTOK_PROXIES: List[str] = [
+        proxy.strip() for proxy in os.getenv('TIKTOK_PROXIES', '').split(',') if proxy.strip()
+    ]
+    PROXY_MAX_REQUESTS_PER_MINUTE: int = int(os.getenv('PROXY_MAX_REQUESTS_PER_MINUTE', '30'))
+    PROXY_QUARANTINE_SECONDS: int = int(os.getenv('PROXY_QUARANTINE_SECONDS', '600'))
+    
+    # Circuit breaker for failing creators (deleted/private/banned accounts)
+    CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '3'))
+    CIRCUIT_BASE_BACKOFF_MINUTES: int = int(os.getenv('CIRCUIT_BASE_BACKOFF_MINUTES', '30'))
+    CIRCUIT_MAX_BACKOFF_HOURS: int = int(os.getenv('CIRCUIT_MAX_BACKOFF_HOURS', '24'))
     
     def validate(self) -> bool:
         """Validate required settings are present."""
         required = [
             ('TELEGRAM_BOT_TOKEN', self.TELEGRAM_BOT_TOKEN),
-            ('SUPABASE_URL', self.SUPABASE_URL),
-            ('SUPABASE_KEY', self.SUPABASE_KEY),
         ]
         
+        if self.DATABASE_BACKEND.lower() == 'postgres':
+            required.append(('DATABASE_URL', self.DATABASE_URL))
+        else:
+            required.extend([
+                ('SUPABASE_URL', self.SUPABASE_URL),
+                ('SUPABASE_KEY', self.SUPABASE_KEY),
+            ])
+        
         missing = [name for name, value in required if not value]
         
         if missing:
@@ -52,6 +119,7 @@ class Settings:
             f"  TELEGRAM_BOT_TOKEN={'*' * 10 if self.TELEGRAM_BOT_TOKEN else 'NOT_SET'},\n"
             f"  SUPABASE_URL={self.SUPABASE_URL[:30]}... if self.SUPABASE_URL else 'NOT_SET',\n"
             f"  SUPABASE_KEY={'*' * 10 if self.SUPABASE_KEY else 'NOT_SET'},\n"
+            f"  DATABASE_BACKEND={self.DATABASE_BACKEND},\n"
             f"  MONITOR_INTERVAL_MINUTES={self.MONITOR_INTERVAL_MINUTES},\n"
             f"  MAX_POSTS_PER_CHECK={self.MAX_POSTS_PER_CHECK},\n"
             f"  LOG_LEVEL={self.LOG_LEVEL}\n"
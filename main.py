@@ -1,34 +1,50 @@
 """TikTok Hashtag Alert Bot - Main application."""
+import time
+
+_PROCESS_START = time.perf_counter()
+
 import logging
-from logging.handlers import RotatingFileHandler
 import asyncio
 import signal
 import sys
+from contextlib import contextmanager
+from typing import List, Tuple
 
 from config.settings import settings
-from src.database.supabase_client import SupabaseClient
-from src.tiktok.scraper import TikTokScraper
-from src.bot.telegram_bot import TelegramBot
-from src.scheduler.monitor import Monitor
-from src.scheduler.scheduler import TaskScheduler
+from config.logging_config import setup_logging
 
-# Setup logging with rotation
-logging.basicConfig(
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    level=getattr(logging, settings.LOG_LEVEL),
-    handlers=[
-        RotatingFileHandler(
-            'bot.log',
-            maxBytes=10*1024*1024,  # 10MB
-            backupCount=5  # Keep 5 old logs
-        ),
-        logging.StreamHandler()
-    ]
-)
+# Setup non-blocking logging (before importing subsystems so their
+# import-time messages are captured)
+log_listener = setup_logging()
 
 logger = logging.getLogger(__name__)
 
 
+class StartupProfile:
+    """Records how long each startup phase takes."""
+    
+    def __init__(self):
+        """Initialize empty profile."""
+        self.phases: List[Tuple[str, float]] = [
+            ('bootstrap', time.perf_counter() - _PROCESS_START)
+        ]
+    
+    @contextmanager
+    def phase(self, name: str):
+        """Time a startup phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+    
+    def report(self):
+        """Log the timing breakdown."""
+        total = time.perf_counter() - _PROCESS_START
+        breakdown = ", ".join(f"{name}={elapsed:.2f}s" for name, elapsed in self.phases)
+        logger.info(f"Startup profile: {breakdown} (total {total:.2f}s)")
+
+
 class Application:
     """Main application orchestrator."""
     
@@ -39,6 +55,10 @@ class Application:
         self.telegram_bot = None
         self.monitor = None
         self.scheduler = None
+        self.digest_task = None
+        self.warm_up_task = None
+        self.sync_task = None
+        self.profile = StartupProfile()
         self.running = False
     
     def initialize(self):
@@ -46,19 +66,30 @@ class Application:
         try:
             logger.info("Initializing TikTok Hashtag Alert Bot...")
             
+            # Import subsystems (Telegram and Supabase SDKs are the heavy part)
+            with self.profile.phase('imports'):
+                from src.database.factory import create_database_client
+                from src.tiktok.scraper import TikTokScraper
+                from src.bot.telegram_bot import TelegramBot
+                from src.scheduler.monitor import Monitor
+                from src.scheduler.scheduler import TaskScheduler
+            
             # Validate settings
-            settings.validate()
+            with self.profile.phase('settings'):
+                settings.validate()
             logger.info("Configuration validated successfully")
             
-            # Initialize database client
-            self.db_client = SupabaseClient()
+            # Initialize database client (wrapped in the local store if enabled)
+            with self.profile.phase('database'):
+                self.db_client = create_database_client()
             
-            # Initialize TikTok scraper
+            # Initialize TikTok scraper (yt-dlp is loaded later, in the background)
             self.tiktok_scraper = TikTokScraper()
             
             # Initialize Telegram bot
-            self.telegram_bot = TelegramBot(self.db_client)
-            self.telegram_bot.setup()
+            with self.profile.phase('telegram_setup'):
+                self.telegram_bot = TelegramBot(self.db_client)
+                self.telegram_bot.setup()
             
             # Initialize monitor
             self.monitor = Monitor(
@@ -70,6 +101,13 @@ class Application:
             # Initialize scheduler
             self.scheduler = TaskScheduler(self.monitor)
             
+            # Check creators added with /add right away
+            self.telegram_bot.handlers.on_creator_added = self.scheduler.check_now
+            self.telegram_bot.handlers.seeding = self.scheduler.seeding
+            self.telegram_bot.handlers.fair_share = self.scheduler.fair_share
+            self.telegram_bot.handlers.scraper = self.tiktok_scraper
+            self.telegram_bot.handlers.trending = self.monitor.trending
+            
             logger.info("All components initialized successfully")
             
         except Exception as e:
@@ -79,16 +117,34 @@ class Application:
     async def start(self):
         """Start the application (async)."""
         self.running = True
+        
+        # Sync the local store with Supabase in the background
+        if settings.LOCAL_STORE_PATH:
+            self.sync_task = asyncio.create_task(self.db_client.run_sync_loop(
+                settings.LOCAL_STORE_SYNC_SECONDS,
+                settings.LOCAL_STORE_REFRESH_MINUTES
+            ))
+        
+        # Initialize and run Telegram bot first so commands are answered
+        # while the scraping backend is still loading
+        logger.info("Starting Telegram bot polling...")
+        with self.profile.phase('telegram_start'):
+            await self.telegram_bot.application.initialize()
+            await self.telegram_bot.application.start()
+            await self.telegram_bot.application.updater.start_polling()
+        
         logger.info("TikTok Hashtag Alert Bot is running!")
+        self.profile.report()
+        
+        # Load yt-dlp in the background
+        self.warm_up_task = asyncio.create_task(self.tiktok_scraper.warm_up())
         
         # Start scheduler task (non-blocking)
         self.scheduler.start()
         
-        # Initialize and run Telegram bot
-        logger.info("Starting Telegram bot polling...")
-        await self.telegram_bot.application.initialize()
-        await self.telegram_bot.application.start()
-        await self.telegram_bot.application.updater.start_polling()
+        # Send windowed digests in the background
+        if settings.ALERT_DIGEST_WINDOW_SECONDS > 0:
+            self.digest_task = asyncio.create_task(self.telegram_bot.run_digest_flusher())
         
         # Keep running until stopped
         try:
@@ -107,11 +163,39 @@ class Application:
         if self.scheduler:
             await self.scheduler.stop()
         
+        # Stop digest flusher and send what is left
+        if self.digest_task:
+            self.digest_task.cancel()
+            try:
+                await self.digest_task
+            except asyncio.CancelledError:
+                pass
+        
+        if self.telegram_bot and self.telegram_bot.bot:
+            await self.telegram_bot.flush_digests(force=True)
+        
+        # Stop local store sync and push remaining writes
+        if self.sync_task:
+            self.sync_task.cancel()
+            try:
+                await self.sync_task
+            except asyncio.CancelledError:
+                pass
+            await asyncio.to_thread(self.db_client.sync_pending)
+        
         # Stop Telegram bot
         if self.telegram_bot and self.telegram_bot.application:
             await self.telegram_bot.application.updater.stop()
             await self.telegram_bot.application.stop()
         
+        # Stop the extraction pool (stuck extractions are not waited for)
+        if self.tiktok_scraper:
+            self.tiktok_scraper.close()
+        
+        # Close database connections
+        if self.db_client:
+            self.db_client.close()
+        
         self.running = False
         logger.info("Application stopped")
     
@@ -143,6 +227,9 @@ def main():
     except Exception as e:
         logger.error(f"Fatal error: {e}", exc_info=True)
         sys.exit(1)
+    finally:
+        # Flush queued log records
+        log_listener.stop()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,4 @@
+"""Analytics package."""
+from .trending import TrendingHashtags
+
+__all__ = ['TrendingHashtags']
@@ -0,0 +1,165 @@
+"""Trending hashtags over sliding time windows."""
+import time
+from collections import deque
+from datetime import timezone
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from src.models import Post
+
+# Window name -> (window length, bucket length) in seconds
+WINDOWS = {
+    'hour': (3600, 300),
+    'day': (86400, 3600),
+    'week': (7 * 86400, 6 * 3600),
+}
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy hitter summary.
+
+    Keeps at most ``capacity`` counters. When a new item arrives and the
+    summary is full, the smallest counter is handed over to it, so every
+    item seen at least ``total / capacity`` times is guaranteed to be kept.
+    Counts are overestimated by at most the count that was taken over.
+    """
+    
+    __slots__ = ('capacity', 'counts')
+    
+    def __init__(self, capacity: int, counts: Optional[Dict[str, int]] = None):
+        """Initialize an empty summary."""
+        self.capacity = capacity
+        self.counts: Dict[str, int] = counts or {}
+    
+    def add(self, item: str, count: int = 1):
+        """Count an item."""
+        if item in self.counts:
+            self.counts[item] += count
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = count
+        else:
+            smallest = min(self.counts, key=self.counts.__getitem__)
+            self.counts[item] = self.counts.pop(smallest) + count
+
+
+class SlidingWindowCounter:
+    """Heavy hitters of the last ``window_seconds``, kept in time buckets."""
+    
+    __slots__ = ('window_seconds', 'bucket_seconds', 'capacity', 'buckets')
+    
+    def __init__(self, window_seconds: int, bucket_seconds: int, capacity: int):
+        """Initialize counter."""
+        self.window_seconds = window_seconds
+        self.bucket_seconds = bucket_seconds
+        self.capacity = capacity
+        # (bucket start, summary), oldest first
+        self.buckets: Deque[Tuple[int, SpaceSaving]] = deque()
+    
+    def _expire(self, now: float):
+        """Drop buckets that left the window."""
+        while self.buckets and self.buckets[0][0] + self.bucket_seconds <= now - self.window_seconds:
+            self.buckets.popleft()
+    
+    def add(self, item: str, timestamp: float, now: float):
+        """Count an item seen at ``timestamp``."""
+        if timestamp <= now - self.window_seconds or timestamp > now:
+            return
+        
+        start = int(timestamp // self.bucket_seconds * self.bucket_seconds)
+        for bucket_start, summary in reversed(self.buckets):
+            if bucket_start == start:
+                summary.add(item)
+                return
+            if bucket_start < start:
+                break
+        
+        summary = SpaceSaving(self.capacity)
+        summary.add(item)
+        self.buckets.append((start, summary))
+        if len(self.buckets) > 1 and self.buckets[-2][0] > start:
+            # Late post for an older bucket that had no entries yet
+            self.buckets = deque(sorted(self.buckets, key=lambda bucket: bucket[0]))
+        self._expire(now)
+    
+    def top(self, n: int, now: float) -> List[Tuple[str, int]]:
+        """Get the ``n`` most frequent items of the window."""
+        self._expire(now)
+        
+        totals: Dict[str, int] = {}
+        for _, summary in self.buckets:
+            for item, count in summary.counts.items():
+                totals[item] = totals.get(item, 0) + count
+        
+        return sorted(totals.items(), key=lambda entry: (-entry[1], entry[0]))[:n]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-serializable snapshot."""
+        return {
+            'buckets': [[start, summary.counts] for start, summary in self.buckets],
+        }
+    
+    def load(self, data: Dict[str, Any]):
+        """Restore buckets from a snapshot."""
+        self.buckets = deque(
+            (int(start), SpaceSaving(self.capacity, dict(counts)))
+            for start, counts in sorted(data.get('buckets', []), key=lambda bucket: bucket[0])
+        )
+
+
+class TrendingHashtags:
+    """
+    Streaming hashtag counts over the last hour, day and week.
+
+    Each window is split into time buckets that each hold a Space-Saving
+    summary of at most ``capacity`` hashtags, so memory stays bounded no
+    matter how many posts are seen. Old buckets fall off as time passes.
+    """
+    
+    def __init__(self, capacity: int = 200):
+        """Initialize counters for every window."""
+        self.windows = {
+            name: SlidingWindowCounter(window_seconds, bucket_seconds, capacity)
+            for name, (window_seconds, bucket_seconds) in WINDOWS.items()
+        }
+        self.changed = False
+    
+    def add_post(self, post: Post):
+        """Count the hashtags of a new post at its creation time."""
+        if not post.hashtags:
+            return
+        
+        now = time.time()
+        timestamp = now
+        if post.created_at is not None:
+            created_at = post.created_at
+            if created_at.tzinfo is None:
+                created_at = created_at.replace(tzinfo=timezone.utc)
+            timestamp = min(created_at.timestamp(), now)
+        
+        for tag in {tag.lower() for tag in post.hashtags}:
+            for counter in self.windows.values():
+                counter.add(tag, timestamp, now)
+        self.changed = True
+    
+    def top(self, window: str = 'day', n: int = 10) -> List[Tuple[str, int]]:
+        """
+        Get the most used hashtags of a window.
+
+        Args:
+            window: 'hour', 'day' or 'week'
+            n: Number of hashtags
+
+        Returns:
+            (hashtag, count) pairs, most used first
+        """
+        return self.windows[window].top(n, time.time())
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Convert all windows to a JSON-serializable snapshot."""
+        return {name: counter.to_dict() for name, counter in self.windows.items()}
+    
+    def restore(self, data: Dict[str, Any]):
+        """Restore windows from a snapshot."""
+        for name, counter in self.windows.items():
+            if name in data:
+                counter.load(data[name])
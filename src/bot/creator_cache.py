@@ -0,0 +1,67 @@
+"""Per-user cache of tracked creators."""
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+from src.models import Creator
+
+logger = logging.getLogger(__name__)
+
+
+class CreatorCache:
+    """
+    Read-through cache of each user's tracked creators.
+
+    Entries are keyed by Telegram user ID and hold the user's creators
+    keyed by username. ``/add`` and ``/remove`` update entries in place;
+    entries older than the TTL are reloaded from the database.
+    """
+    
+    def __init__(self, ttl_seconds: int = 300):
+        """Initialize cache with a time-to-live in seconds."""
+        self.ttl = ttl_seconds
+        self._entries: Dict[int, Tuple[float, Dict[str, Creator]]] = {}
+    
+    def get(self, telegram_user_id: int) -> Optional[List[Creator]]:
+        """Get a user's creators, or None if not cached or expired."""
+        creators = self._get_entry(telegram_user_id)
+        return list(creators.values()) if creators is not None else None
+    
+    def set(self, telegram_user_id: int, creators: List[Creator]):
+        """Replace a user's cached creators."""
+        self._entries[telegram_user_id] = (
+            time.monotonic(),
+            {creator.tiktok_username: creator for creator in creators}
+        )
+    
+    def contains(self, telegram_user_id: int, tiktok_username: str) -> Optional[bool]:
+        """Check whether a user tracks a creator, or None if not cached."""
+        creators = self._get_entry(telegram_user_id)
+        if creators is None:
+            return None
+        return tiktok_username.lower() in creators
+    
+    def add(self, telegram_user_id: int, creator: Creator):
+        """Add a creator to a user's cached set (no-op if not cached)."""
+        creators = self._get_entry(telegram_user_id)
+        if creators is not None:
+            creators[creator.tiktok_username] = creator
+    
+    def remove(self, telegram_user_id: int, tiktok_username: str):
+        """Remove a creator from a user's cached set (no-op if not cached)."""
+        creators = self._get_entry(telegram_user_id)
+        if creators is not None:
+            creators.pop(tiktok_username.lower(), None)
+    
+    def _get_entry(self, telegram_user_id: int) -> Optional[Dict[str, Creator]]:
+        """Get a live entry, evicting it if expired."""
+        entry = self._entries.get(telegram_user_id)
+        if entry is None:
+            return None
+        
+        loaded_at, creators = entry
+        if time.monotonic() - loaded_at > self.ttl:
+            del self._entries[telegram_user_id]
+            return None
+        
+        return creators
@@ -0,0 +1,131 @@
+"""Alert digests that coalesce many posts into few Telegram messages."""
+import logging
+import time
+from typing import Dict, List, Tuple
+from telegram.helpers import escape_markdown
+
+from src.models import Post
+
+logger = logging.getLogger(__name__)
+
+# Telegram rejects messages longer than this
+TELEGRAM_MAX_MESSAGE_LENGTH = 4096
+
+ALERT_MODE_IMMEDIATE = 'immediate'
+ALERT_MODE_DIGEST = 'digest'
+ALERT_MODES = (ALERT_MODE_IMMEDIATE, ALERT_MODE_DIGEST)
+
+
+class AlertDigest:
+    """
+    Per-user buffer of pending alerts.
+
+    Posts are collected per Telegram user and released together once the
+    user's buffer is older than the window. A window of 0 means buffers are
+    only released when the monitoring cycle flushes them.
+    """
+    
+    def __init__(self, window_seconds: int = 0):
+        """Initialize digest with a collection window in seconds."""
+        self.window = window_seconds
+        self._pending: Dict[int, Tuple[float, List[Post]]] = {}
+    
+    def add(self, telegram_user_id: int, post: Post):
+        """Queue a post for a user's next digest."""
+        entry = self._pending.get(telegram_user_id)
+        if entry is None:
+            self._pending[telegram_user_id] = (time.monotonic(), [post])
+        else:
+            entry[1].append(post)
+    
+    def pop_due(self, force: bool = False) -> List[Tuple[int, List[Post]]]:
+        """
+        Remove and return buffers that are ready to send.
+
+        Args:
+            force: Release every buffer regardless of its age
+
+        Returns:
+            List of (telegram_user_id, posts) pairs
+        """
+        now = time.monotonic()
+        due = [
+            user_id for user_id, (started_at, _) in self._pending.items()
+            if force or (self.window and now - started_at >= self.window)
+        ]
+        return [(user_id, self._pending.pop(user_id)[1]) for user_id in due]
+    
+    def __len__(self) -> int:
+        """Number of users with pending alerts."""
+        return len(self._pending)
+
+
+def split_text(text: str, limit: int = TELEGRAM_MAX_MESSAGE_LENGTH) -> List[str]:
+    """
+    Split text into pieces of at most ``limit`` characters.
+
+    Splits between lines, and inside a line only if it is longer than the
+    limit (at spaces), so links and escaped characters stay whole.
+    """
+    parts = []
+    for line in text.splitlines(keepends=True):
+        while len(line) > limit:
+            cut = line.rfind(" ", 0, limit) + 1 or limit
+            parts.append(line[:cut])
+            line = line[cut:]
+        parts.append(line)
+    
+    pieces = []
+    current = ""
+    for part in parts:
+        if current and len(current) + len(part) > limit:
+            pieces.append(current)
+            current = ""
+        current += part
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def render_digest(posts: List[Post]) -> List[str]:
+    """
+    Render posts into Markdown digest messages.
+
+    Posts are kept whole; a new message is started only when the next
+    post would push the current one past Telegram's length limit (a post
+    longer than the limit on its own is split). Descriptions and hashtags
+    are escaped, since a stray ``_`` or ``*`` makes Telegram reject the
+    whole message.
+
+    Args:
+        posts: New posts
+
+    Returns:
+        List of message texts
+    """
+    header = f"🔔 *{len(posts)} bài viết mới*\n\n"
+    messages = []
+    current = header
+    
+    for post in posts:
+        description = escape_markdown((post.description or 'Không có mô tả')[:200], version=1)
+        # Text inside *...* is taken literally, so the username is not escaped
+        block = (
+            f"👤 *@{post.author}*\n"
+            f"📝 {description}\n"
+        )
+        hashtags_text = " ".join([f"#{escape_markdown(tag, version=1)}" for tag in post.hashtags])
+        if hashtags_text:
+            block += f"🏷️ {hashtags_text}\n"
+        block += f"🔗 [Xem bài viết]({post.url})\n\n"
+        
+        for piece in split_text(block):
+            if len(current) + len(piece) > TELEGRAM_MAX_MESSAGE_LENGTH and current != header:
+                messages.append(current.rstrip())
+                current = ""
+            current += piece
+    
+    if current.strip():
+        messages.append(current.rstrip())
+    
+    return messages
@@ -1,27 +1,121 @@
 """Telegram bot command handlers."""
+import asyncio
+import csv
+import io
 import logging
-from typing import Optional
-from telegram import Update
+import re
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
 from telegram.ext import ContextTypes
 
-from src.database.supabase_client import SupabaseClient
+from config.settings import settings
+from src.database.base import StorageBackend
+from src.models import Creator, Post
+from src.bot.creator_cache import CreatorCache
+from src.bot.digest import ALERT_MODES, ALERT_MODE_IMMEDIATE, ALERT_MODE_DIGEST
+from src.scheduler.fair_share import FairShareScheduler
+from src.tiktok.scraper import TikTokScraper
+from src.analytics.trending import TrendingHashtags, WINDOWS
 
 logger = logging.getLogger(__name__)
 
+# TikTok usernames: letters, digits, underscores and periods; also accept profile URLs
+USERNAME_PATTERN = re.compile(r'^(?:https?://)?(?:(?:www|m)\.)?(?:tiktok\.com/)?@?([a-z0-9_.]{2,24})/?$')
+
+# Largest CSV file accepted by /import
+MAX_IMPORT_FILE_BYTES = 1024 * 1024
+
+# Usernames listed per group in the import summary
+SUMMARY_MAX_USERNAMES = 30
+
+# Hashtags listed by /trending
+TRENDING_TOP_N = 10
+
+# Results per /search page
+SEARCH_PAGE_SIZE = 5
+
+# Newest matches ranked by search_posts (its max_candidates default)
+SEARCH_MAX_CANDIDATES = 1000
+
+# /search result messages whose page buttons still work (oldest are forgotten)
+SEARCH_STATES_MAX = 1000
+
+TRENDING_WINDOW_LABELS = {
+    'hour': '1 giờ qua',
+    'day': '24 giờ qua',
+    'week': '7 ngày qua',
+}
+
+
+def parse_username(text: str) -> Optional[str]:
+    """Normalize a username, @username or profile URL (None if invalid)."""
+    # Shared profile links carry a query string (?is_from_webapp=1&sender_device=pc)
+    text = text.strip().split('?', 1)[0].split('#', 1)[0]
+    match = USERNAME_PATTERN.match(text.lower())
+    return match.group(1) if match else None
+
+
+def format_usernames(usernames: List[str]) -> str:
+    """List usernames for a reply, shortening long lists."""
+    text = ", ".join(f"@{username}" for username in usernames[:SUMMARY_MAX_USERNAMES])
+    if len(usernames) > SUMMARY_MAX_USERNAMES:
+        text += f" và {len(usernames) - SUMMARY_MAX_USERNAMES} tài khoản khác"
+    return text
+
 
 class BotHandlers:
     """Telegram bot command handlers."""
     
-    def __init__(self, db_client: SupabaseClient):
+    def __init__(self, db_client: StorageBackend):
         """Initialize handlers with database client."""
         self.db = db_client
+        self.creator_cache = CreatorCache(ttl_seconds=settings.CREATOR_CACHE_TTL_SECONDS)
+        self.alert_modes: Dict[int, str] = {}
+        # Called with each newly added creator (set to the scheduler's priority lane)
+        self.on_creator_added: Optional[Callable[[Creator], None]] = None
+        # Creators the scheduler must skip until their posts are seeded (set by the application)
+        self.seeding: Optional[Set[str]] = None
+        # Scrape budget sharing, reported by /usage (set by the application)
+        self.fair_share: Optional[FairShareScheduler] = None
+        # Used to check that creators exist when adding many at once (set by the application)
+        self.scraper: Optional[TikTokScraper] = None
+        # Hashtag counts fed by the monitor, reported by /trending (set by the application)
+        self.trending: Optional[TrendingHashtags] = None
+        # Usernames of bulk adds still being checked, per user
+        self.pending_adds: Dict[int, Set[str]] = {}
+        # Background bulk adds (kept so they are not garbage collected)
+        self.background_tasks: Set[asyncio.Task] = set()
+        # Query and page cursors of each /search result message, keyed by (chat_id, message_id)
+        self.search_states: 'OrderedDict[Tuple[int, int], Dict[str, Any]]' = OrderedDict()
+    
+    async def get_user_creators(self, telegram_user_id: int) -> List[Creator]:
+        """Get a user's tracked creators, served from cache when fresh."""
+        creators = self.creator_cache.get(telegram_user_id)
+        if creators is None:
+            rows = await asyncio.to_thread(
+                self.db.get_tracked_creators, telegram_user_id=telegram_user_id
+            )
+            creators = [Creator.from_row(row) for row in rows]
+            self.creator_cache.set(telegram_user_id, creators)
+        return creators
+    
+    async def get_alert_mode(self, telegram_user_id: int) -> str:
+        """Get a user's alert delivery mode, loading it once from the database."""
+        alert_mode = self.alert_modes.get(telegram_user_id)
+        if alert_mode is None:
+            bot_user = await asyncio.to_thread(self.db.get_bot_user, telegram_user_id)
+            alert_mode = (bot_user or {}).get('alert_mode') or ALERT_MODE_IMMEDIATE
+            self.alert_modes[telegram_user_id] = alert_mode
+        return alert_mode
     
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /start command."""
         user = update.effective_user
         
         # Register user in database
-        self.db.add_or_update_bot_user(
+        await asyncio.to_thread(
+            self.db.add_or_update_bot_user,
             telegram_user_id=user.id,
             username=user.username,
             first_name=user.first_name
@@ -34,8 +128,13 @@ class BotHandlers:
             "khi họ đăng bài mới kèm hashtag.\n\n"
             "📌 Các lệnh có thể dùng:\n"
             "/add <username> - Thêm TikToker vào danh sách theo dõi\n"
+            "/import - Thêm nhiều TikToker từ file CSV\n"
             "/remove <username> - Xóa TikToker khỏi danh sách\n"
             "/list - Xem danh sách TikToker đang theo dõi\n"
+            "/mode <immediate|digest> - Chọn cách nhận thông báo\n"
+            "/usage - Xem mức sử dụng của bạn\n"
+            "/trending <hour|day|week> - Xem hashtag thịnh hành\n"
+            "/search <từ khóa> - Tìm bài viết của TikToker bạn theo dõi\n"
             "/help - Xem hướng dẫn\n\n"
             "Ví dụ: /add khaby.lame"
         )
@@ -49,12 +148,26 @@ class BotHandlers:
             "📖 Hướng dẫn sử dụng:\n\n"
             "1️⃣ Thêm TikToker để theo dõi:\n"
             "/add <username>\n"
-            "Ví dụ: /add khaby.lame\n\n"
+            "Ví dụ: /add khaby.lame\n"
+            "Thêm nhiều: /add khaby.lame charlidamelio\n"
+            "Từ file CSV: gửi file với chú thích /import\n\n"
             "2️⃣ Xóa TikToker:\n"
             "/remove <username>\n"
             "Ví dụ: /remove khaby.lame\n\n"
             "3️⃣ Xem danh sách:\n"
             "/list\n\n"
+            "4️⃣ Chọn cách nhận thông báo:\n"
+            "/mode immediate - Nhận từng bài viết ngay lập tức\n"
+            "/mode digest - Gom nhiều bài viết vào một tin nhắn\n\n"
+            "5️⃣ Xem mức sử dụng:\n"
+            "/usage\n\n"
+            "6️⃣ Xem hashtag thịnh hành:\n"
+            "/trending hour - 1 giờ qua\n"
+            "/trending day - 24 giờ qua\n"
+            "/trending week - 7 ngày qua\n\n"
+            "7️⃣ Tìm bài viết theo mô tả hoặc hashtag:\n"
+            "/search <từ khóa>\n"
+            "Ví dụ: /search dance challenge\n\n"
             "⚡ Bot sẽ tự động kiểm tra bài viết mới mỗi 10 phút và "
             "gửi thông báo kèm hashtag cho bạn!"
         )
@@ -72,28 +185,56 @@ class BotHandlers:
             )
             return
         
-        tiktok_username = context.args[0].lstrip('@').lower()
+        # Several usernames, separated by spaces or commas
+        entries = [entry for arg in context.args for entry in arg.split(',') if entry]
+        if len(entries) > 1:
+            await self.add_many(update, entries)
+            return
+        
+        tiktok_username = parse_username(entries[0]) if entries else None
+        if tiktok_username is None:
+            await update.message.reply_text(
+                "❌ Username không hợp lệ!\n"
+                "Ví dụ: /add khaby.lame hoặc /add https://www.tiktok.com/@khaby.lame"
+            )
+            return
         
         # Check if already tracking
-        existing = self.db.get_tracked_creator_by_username(tiktok_username)
+        creators = await self.get_user_creators(user.id)
+        pending = self.pending_adds.get(user.id, set())
         
-        if existing and existing.get('added_by_telegram_user') == user.id:
+        if self.creator_cache.contains(user.id, tiktok_username) or tiktok_username in pending:
             await update.message.reply_text(
                 f"ℹ️ Bạn đã theo dõi @{tiktok_username} rồi!"
             )
             return
         
+        # Check the user's quota
+        if settings.MAX_CREATORS_PER_USER and len(creators) + len(pending) >= settings.MAX_CREATORS_PER_USER:
+            await update.message.reply_text(
+                f"❌ Bạn đã theo dõi tối đa {settings.MAX_CREATORS_PER_USER} TikToker.\n"
+                f"Dùng /remove <username> để bỏ bớt trước khi thêm mới."
+            )
+            return
+        
         # Add to tracking list
-        result = self.db.add_tracked_creator(
+        result = await asyncio.to_thread(
+            self.db.add_tracked_creator,
             tiktok_username=tiktok_username,
             telegram_user_id=user.id
         )
         
         if result:
+            creator = Creator.from_row(result)
+            self.creator_cache.add(user.id, creator)
             await update.message.reply_text(
                 f"✅ Đã thêm @{tiktok_username} vào danh sách theo dõi!\n"
                 f"Bạn sẽ nhận thông báo khi họ đăng bài mới. 🔔"
             )
+            
+            # Check the account right away instead of waiting for the next cycle
+            if self.on_creator_added:
+                self.on_creator_added(creator)
             logger.info(f"User {user.id} added creator @{tiktok_username}")
         else:
             await update.message.reply_text(
@@ -101,6 +242,190 @@ class BotHandlers:
                 f"Username này có thể đã được theo dõi hoặc có lỗi xảy ra."
             )
     
+    async def add_many(self, update: Update, entries: List[str]):
+        """
+        Add several creators at once and reply with a summary.
+        
+        Accounts are checked concurrently through the scraper; the ones that
+        exist are inserted with one database call and their current posts
+        are stored without alerting. Checking can take minutes, so it runs
+        in the background and the summary is sent when it is done, leaving
+        the user's other commands free in the meantime.
+        
+        Args:
+            update: Telegram update to reply to
+            entries: Usernames, @usernames or profile URLs
+        """
+        user = update.effective_user
+        
+        usernames: List[str] = []
+        invalid: List[str] = []
+        for entry in entries:
+            username = parse_username(entry)
+            if username is None:
+                invalid.append(entry.strip())
+            elif username not in usernames:
+                usernames.append(username)
+        
+        creators = await self.get_user_creators(user.id)
+        pending = self.pending_adds.setdefault(user.id, set())
+        already_tracked = [
+            u for u in usernames if self.creator_cache.contains(user.id, u) or u in pending
+        ]
+        usernames = [u for u in usernames if u not in already_tracked]
+        
+        # Don't check more accounts than the user's quota has room for
+        over_quota: List[str] = []
+        if settings.MAX_CREATORS_PER_USER:
+            room = max(settings.MAX_CREATORS_PER_USER - len(creators) - len(pending), 0)
+            usernames, over_quota = usernames[:room], usernames[room:]
+        
+        if usernames and self.scraper:
+            await update.message.reply_text(f"⏳ Đang kiểm tra {len(usernames)} tài khoản...")
+        
+        # Reserve the usernames against the quota until the check is done
+        pending.update(usernames)
+        task = asyncio.create_task(
+            self._finish_add_many(update, usernames, already_tracked, over_quota, invalid)
+        )
+        self.background_tasks.add(task)
+        task.add_done_callback(self.background_tasks.discard)
+    
+    async def _finish_add_many(
+        self,
+        update: Update,
+        usernames: List[str],
+        already_tracked: List[str],
+        over_quota: List[str],
+        invalid: List[str]
+    ):
+        """Check and insert the accounts of a bulk add, then send the summary."""
+        user = update.effective_user
+        try:
+            await self._insert_many(update, usernames, already_tracked, over_quota, invalid)
+        except Exception as e:
+            logger.error(f"Error adding creators in bulk for user {user.id}: {e}", exc_info=True)
+            await update.message.reply_text("❌ Có lỗi xảy ra khi thêm TikToker. Vui lòng thử lại.")
+        finally:
+            pending = self.pending_adds.get(user.id)
+            if pending is not None:
+                pending.difference_update(usernames)
+                if not pending:
+                    del self.pending_adds[user.id]
+    
+    async def _insert_many(
+        self,
+        update: Update,
+        usernames: List[str],
+        already_tracked: List[str],
+        over_quota: List[str],
+        invalid: List[str]
+    ):
+        """Check accounts, insert the ones that exist and reply with a summary."""
+        user = update.effective_user
+        
+        not_found: List[str] = []
+        posts_by_username = {}
+        if usernames and self.scraper:
+            posts_by_username = await self.scraper.check_accounts(
+                usernames,
+                count=settings.MAX_POSTS_PER_CHECK,
+                concurrency=settings.IMPORT_VALIDATE_CONCURRENCY
+            )
+            not_found = [u for u in usernames if posts_by_username[u] is None]
+            usernames = [u for u in usernames if posts_by_username[u] is not None]
+        
+        # Keep the scheduler off the new creators until their posts are
+        # stored, or a check in between would alert every existing post
+        seeding = set(usernames) - (self.seeding or set())
+        if self.seeding is not None:
+            self.seeding.update(seeding)
+        try:
+            rows = await asyncio.to_thread(self.db.add_tracked_creators, usernames, user.id) if usernames else []
+            added = [Creator.from_row(row) for row in rows]
+            added_usernames = {creator.tiktok_username for creator in added}
+            # Usernames that were found but not inserted are tracked by another user
+            already_tracked += [u for u in usernames if u not in added_usernames]
+            
+            # Store the posts found while checking, so they are not alerted later
+            seed_rows = [
+                post.to_row(creator.id)
+                for creator in added
+                for post in posts_by_username.get(creator.tiktok_username) or []
+            ]
+            if seed_rows:
+                await asyncio.to_thread(self.db.add_posts, seed_rows)
+        finally:
+            if self.seeding is not None:
+                self.seeding.difference_update(seeding)
+        
+        for creator in added:
+            self.creator_cache.add(user.id, creator)
+        
+        message = "📥 Kết quả thêm TikToker:\n\n"
+        if added:
+            message += f"✅ Đã thêm ({len(added)}): {format_usernames([c.tiktok_username for c in added])}\n\n"
+        if already_tracked:
+            message += f"ℹ️ Đã được theo dõi ({len(already_tracked)}): {format_usernames(already_tracked)}\n\n"
+        if not_found:
+            message += f"⚠️ Không tìm thấy ({len(not_found)}): {format_usernames(not_found)}\n\n"
+        if over_quota:
+            message += (
+                f"🚫 Vượt giới hạn {settings.MAX_CREATORS_PER_USER} TikToker "
+                f"({len(over_quota)}): {format_usernames(over_quota)}\n\n"
+            )
+        if invalid:
+            message += f"❌ Username không hợp lệ ({len(invalid)}): {', '.join(invalid[:SUMMARY_MAX_USERNAMES])}\n\n"
+        
+        await update.message.reply_text(message.strip())
+        logger.info(
+            f"User {user.id} added {len(added)} creators in bulk "
+            f"({len(already_tracked)} tracked, {len(not_found)} not found, "
+            f"{len(over_quota)} over quota, {len(invalid)} invalid)"
+        )
+    
+    async def import_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /import: add creators listed in a CSV file (first column)."""
+        message = update.message
+        document = message.document
+        if document is None and message.reply_to_message:
+            document = message.reply_to_message.document
+        
+        if document is None:
+            await message.reply_text(
+                "📎 Gửi file CSV với chú thích /import, hoặc trả lời file CSV bằng /import.\n"
+                "Mỗi dòng một TikToker ở cột đầu tiên (username, @username hoặc link)."
+            )
+            return
+        
+        if document.file_size and document.file_size > MAX_IMPORT_FILE_BYTES:
+            await message.reply_text("❌ File quá lớn! Giới hạn là 1MB.")
+            return
+        
+        try:
+            file = await document.get_file()
+            content = bytes(await file.download_as_bytearray()).decode('utf-8-sig')
+        except Exception as e:
+            logger.error(f"Error downloading import file: {e}")
+            await message.reply_text("❌ Không thể đọc file. Hãy gửi file CSV dạng UTF-8.")
+            return
+        
+        entries = []
+        for row in csv.reader(io.StringIO(content)):
+            cells = [cell.strip() for cell in row if cell.strip()]
+            if cells:
+                entries.append(cells[0])
+        
+        # Skip a header row
+        if entries and parse_username(entries[0]) in ('username', 'tiktok_username'):
+            entries = entries[1:]
+        
+        if not entries:
+            await message.reply_text("❌ File không có username nào!")
+            return
+        
+        await self.add_many(update, entries)
+    
     async def remove_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /remove command to remove a TikTok creator."""
         user = update.effective_user
@@ -112,15 +437,23 @@ class BotHandlers:
             )
             return
         
-        tiktok_username = context.args[0].lstrip('@').lower()
+        tiktok_username = parse_username(context.args[0])
+        if tiktok_username is None:
+            await update.message.reply_text(
+                "❌ Username không hợp lệ!\n"
+                "Ví dụ: /remove khaby.lame hoặc /remove https://www.tiktok.com/@khaby.lame"
+            )
+            return
         
         # Remove from tracking list
-        success = self.db.remove_tracked_creator(
+        success = await asyncio.to_thread(
+            self.db.remove_tracked_creator,
             tiktok_username=tiktok_username,
             telegram_user_id=user.id
         )
         
         if success:
+            self.creator_cache.remove(user.id, tiktok_username)
             await update.message.reply_text(
                 f"✅ Đã xóa @{tiktok_username} khỏi danh sách theo dõi!"
             )
@@ -134,7 +467,7 @@ class BotHandlers:
         """Handle /list command to show tracked creators."""
         user = update.effective_user
         
-        creators = self.db.get_tracked_creators(telegram_user_id=user.id)
+        creators = await self.get_user_creators(user.id)
         
         if not creators:
             await update.message.reply_text(
@@ -145,13 +478,189 @@ class BotHandlers:
         
         message = "📋 Danh sách TikToker đang theo dõi:\n\n"
         for idx, creator in enumerate(creators, 1):
-            username = creator['tiktok_username']
-            message += f"{idx}. @{username}\n"
+            message += f"{idx}. @{creator.tiktok_username}\n"
         
         message += f"\n📊 Tổng: {len(creators)} TikToker"
         
         await update.message.reply_text(message)
     
+    async def mode_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /mode command to choose immediate or digest alerts."""
+        user = update.effective_user
+        
+        if not context.args:
+            alert_mode = await self.get_alert_mode(user.id)
+            await update.message.reply_text(
+                f"⚙️ Chế độ thông báo hiện tại: {alert_mode}\n"
+                "Dùng /mode immediate hoặc /mode digest để thay đổi."
+            )
+            return
+        
+        alert_mode = context.args[0].lower()
+        
+        if alert_mode not in ALERT_MODES:
+            await update.message.reply_text(
+                "❌ Chế độ không hợp lệ!\n"
+                "Ví dụ: /mode digest"
+            )
+            return
+        
+        success = await asyncio.to_thread(self.db.set_alert_mode, user.id, alert_mode)
+        
+        if success:
+            self.alert_modes[user.id] = alert_mode
+            if alert_mode == ALERT_MODE_DIGEST:
+                await update.message.reply_text(
+                    "✅ Đã bật chế độ digest! Các bài viết mới sẽ được gom vào một tin nhắn."
+                )
+            else:
+                await update.message.reply_text(
+                    "✅ Đã bật chế độ immediate! Bạn sẽ nhận từng bài viết ngay khi có."
+                )
+            logger.info(f"User {user.id} set alert mode to {alert_mode}")
+        else:
+            await update.message.reply_text(
+                "❌ Không thể thay đổi chế độ. Hãy dùng /start trước rồi thử lại."
+            )
+    
+    async def usage_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /usage command to show the user's quota and scrape share."""
+        user = update.effective_user
+        
+        creators = await self.get_user_creators(user.id)
+        
+        message = "📊 Mức sử dụng của bạn:\n\n"
+        if settings.MAX_CREATORS_PER_USER:
+            message += f"👤 TikToker: {len(creators)}/{settings.MAX_CREATORS_PER_USER}\n"
+        else:
+            message += f"👤 TikToker: {len(creators)}\n"
+        
+        if self.fair_share:
+            share = self.fair_share.get_share(user.id)
+            message += (
+                f"🔄 Lượt kiểm tra trong chu kỳ này: {share['used']}"
+                f" / {share['total']} của tất cả người dùng ({share['share_percent']}%)\n"
+            )
+            if share['budget']:
+                message += f"⏱️ Giới hạn mỗi chu kỳ: {share['budget']} lượt, chia đều giữa người dùng\n"
+        
+        await update.message.reply_text(message)
+    
+    async def trending_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /trending command to show the most used hashtags."""
+        window = context.args[0].lower() if context.args else 'day'
+        
+        if window not in WINDOWS:
+            await update.message.reply_text(
+                "❌ Khoảng thời gian không hợp lệ!\n"
+                "Ví dụ: /trending hour, /trending day hoặc /trending week"
+            )
+            return
+        
+        top = self.trending.top(window, TRENDING_TOP_N) if self.trending else []
+        
+        if not top:
+            await update.message.reply_text(
+                f"📈 Chưa có hashtag nào trong {TRENDING_WINDOW_LABELS[window]}."
+            )
+            return
+        
+        message = f"📈 Hashtag thịnh hành {TRENDING_WINDOW_LABELS[window]}:\n\n"
+        for idx, (tag, count) in enumerate(top, 1):
+            message += f"{idx}. #{tag} - {count} bài viết\n"
+        
+        await update.message.reply_text(message)
+    
+    async def search_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /search command to search posts of the user's creators."""
+        user = update.effective_user
+        
+        if not context.args:
+            await update.message.reply_text(
+                "❌ Vui lòng nhập từ khóa!\n"
+                "Ví dụ: /search dance challenge"
+            )
+            return
+        
+        query = " ".join(context.args)
+        # cursors[n] is where page n starts (filled in as pages are shown)
+        state = {'user_id': user.id, 'query': query, 'cursors': [None]}
+        
+        text, markup = await self.render_search_page(state, page=0)
+        sent = await update.message.reply_text(
+            text, reply_markup=markup, disable_web_page_preview=True
+        )
+        if markup:
+            self.search_states[(sent.chat_id, sent.message_id)] = state
+            while len(self.search_states) > SEARCH_STATES_MAX:
+                self.search_states.popitem(last=False)
+    
+    async def search_page_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle the previous/next page buttons of /search results."""
+        callback_query = update.callback_query
+        await callback_query.answer()
+        
+        message = callback_query.message
+        state = self.search_states.get((message.chat_id, message.message_id)) if message else None
+        page = int(callback_query.data.split(':', 1)[1])
+        if state is None or page >= len(state['cursors']):
+            await callback_query.edit_message_text("⌛ Kết quả đã hết hạn. Hãy dùng /search lại.")
+            return
+        self.search_states.move_to_end((message.chat_id, message.message_id))
+        
+        text, markup = await self.render_search_page(state, page)
+        await callback_query.edit_message_text(
+            text, reply_markup=markup, disable_web_page_preview=True
+        )
+    
+    async def render_search_page(self, state: Dict[str, Any], page: int):
+        """
+        Search one page of results, continuing from the cursor of that page.
+        
+        Returns:
+            Message text and page buttons (None if there is a single page)
+        """
+        query = state['query']
+        cursors = state['cursors']
+        # Fetch one extra row to know whether there is a next page
+        rows = await asyncio.to_thread(
+            self.db.search_posts,
+            state['user_id'],
+            query,
+            limit=SEARCH_PAGE_SIZE + 1,
+            after=cursors[page]
+        )
+        has_next = len(rows) > SEARCH_PAGE_SIZE
+        rows = rows[:SEARCH_PAGE_SIZE]
+        
+        if not rows:
+            if page == 0:
+                return f"🔍 Không tìm thấy bài viết nào cho \"{query}\".", None
+            return f"🔍 Không còn kết quả cho \"{query}\".", None
+        
+        if has_next:
+            del cursors[page + 1:]
+            cursors.append((rows[-1]['rank'], rows[-1]['tiktok_post_id']))
+        
+        message = f"🔍 Kết quả cho \"{query}\" (trang {page + 1}):\n\n"
+        if rows[0].get('capped'):
+            message += (
+                f"ℹ️ Quá nhiều bài viết khớp: chỉ xếp hạng {SEARCH_MAX_CANDIDATES} bài mới nhất. "
+                "Thêm từ khóa để thu hẹp kết quả.\n\n"
+            )
+        for idx, row in enumerate(rows, page * SEARCH_PAGE_SIZE + 1):
+            post = Post.from_row(row, author=row['tiktok_username'])
+            description = (post.description or 'Không có mô tả')[:100]
+            message += f"{idx}. @{post.author}: {description}\n{post.url}\n\n"
+        
+        buttons = []
+        if page > 0:
+            buttons.append(InlineKeyboardButton("◀️ Trước", callback_data=f"search:{page - 1}"))
+        if has_next:
+            buttons.append(InlineKeyboardButton("Sau ▶️", callback_data=f"search:{page + 1}"))
+        
+        return message.strip(), InlineKeyboardMarkup([buttons]) if buttons else None
+    
     async def error_handler(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle errors."""
         logger.error(f"Update {update} caused error {context.error}")
@@ -1,12 +1,17 @@
 """Telegram bot main module."""
+import asyncio
 import logging
-from typing import Dict, Any, List
+from datetime import datetime
+from typing import List, Optional
 from telegram import Bot
-from telegram.ext import Application, CommandHandler
+from telegram.ext import Application, CallbackQueryHandler, CommandHandler, MessageHandler, filters
 
 from config.settings import settings
-from src.database.supabase_client import SupabaseClient
+from src.database.base import StorageBackend
+from src.models import Creator, Post
 from src.bot.handlers import BotHandlers
+from src.bot.update_processor import PerUserUpdateProcessor
+from src.bot.digest import AlertDigest, ALERT_MODE_DIGEST, render_digest
 
 logger = logging.getLogger(__name__)
 
@@ -14,25 +19,45 @@ logger = logging.getLogger(__name__)
 class TelegramBot:
     """Telegram bot for sending alerts."""
     
-    def __init__(self, db_client: SupabaseClient):
+    def __init__(self, db_client: StorageBackend):
         """Initialize Telegram bot."""
         self.db = db_client
         self.handlers = BotHandlers(db_client)
         self.application = None
         self.bot = None
+        self.update_processor = None
+        self.digest = AlertDigest(window_seconds=settings.ALERT_DIGEST_WINDOW_SECONDS)
     
     def setup(self) -> Application:
         """Setup the Telegram bot application."""
+        # Handle updates concurrently, keeping each user's updates in order
+        self.update_processor = PerUserUpdateProcessor(settings.BOT_MAX_CONCURRENT_UPDATES)
+        
         # Create application
-        self.application = Application.builder().token(settings.TELEGRAM_BOT_TOKEN).build()
+        self.application = Application.builder()\
+            .token(settings.TELEGRAM_BOT_TOKEN)\
+            .concurrent_updates(self.update_processor)\
+            .build()
         self.bot = self.application.bot
         
         # Add command handlers
         self.application.add_handler(CommandHandler("start", self.handlers.start_command))
         self.application.add_handler(CommandHandler("help", self.handlers.help_command))
         self.application.add_handler(CommandHandler("add", self.handlers.add_command))
+        self.application.add_handler(CommandHandler("import", self.handlers.import_command))
+        self.application.add_handler(MessageHandler(
+            filters.Document.ALL & filters.CaptionRegex(r'^/import\b'),
+            self.handlers.import_command
+        ))
         self.application.add_handler(CommandHandler("remove", self.handlers.remove_command))
         self.application.add_handler(CommandHandler("list", self.handlers.list_command))
+        self.application.add_handler(CommandHandler("mode", self.handlers.mode_command))
+        self.application.add_handler(CommandHandler("usage", self.handlers.usage_command))
+        self.application.add_handler(CommandHandler("trending", self.handlers.trending_command))
+        self.application.add_handler(CommandHandler("search", self.handlers.search_command))
+        self.application.add_handler(CallbackQueryHandler(
+            self.handlers.search_page_callback, pattern=r'^search:\d+$'
+        ))
         
         # Add error handler
         self.application.add_error_handler(self.handlers.error_handler)
@@ -40,28 +65,28 @@ class TelegramBot:
         logger.info("Telegram bot setup complete")
         return self.application
     
-    async def send_alert(self, telegram_user_id: int, post: Dict[str, Any]):
+    async def send_alert(self, telegram_user_id: int, post: Post):
         """
         Send a new post alert to a Telegram user.
         
         Args:
             telegram_user_id: Telegram user ID to send to
-            post: Post information dictionary
+            post: New post
         """
         try:
             # Format hashtags
-            hashtags_text = " ".join([f"#{tag}" for tag in post.get('hashtags', [])])
+            hashtags_text = " ".join([f"#{tag}" for tag in post.hashtags])
             
             # Create message
             message = (
-                f"🔔 *Bài viết mới từ @{post.get('author', 'Unknown')}*\n\n"
-                f"📝 {post.get('description', 'Không có mô tả')[:200]}...\n\n"
+                f"🔔 *Bài viết mới từ @{post.author}*\n\n"
+                f"📝 {(post.description or 'Không có mô tả')[:200]}...\n\n"
             )
             
             if hashtags_text:
                 message += f"🏷️ *Hashtags:* {hashtags_text}\n\n"
             
-            message += f"🔗 [Xem bài viết]({post.get('url', '')})"
+            message += f"🔗 [Xem bài viết]({post.url})"
             
             # Send message
             await self.bot.send_message(
@@ -71,42 +96,182 @@ class TelegramBot:
                 disable_web_page_preview=True
             )
             
-            logger.info(f"Sent alert to user {telegram_user_id} for post {post.get('id')}")
+            logger.info(f"Sent alert to user {telegram_user_id} for post {post.id}")
             
         except Exception as e:
             logger.error(
                 f"Error sending alert: user={telegram_user_id}, "
-                f"post={post.get('id')}, creator={post.get('author')}, "
+                f"post={post.id}, creator={post.author}, "
                 f"error={e}",
                 exc_info=True
             )
     
-    async def send_alerts_to_all_users(self, post: Dict[str, Any], creator_username: str):
+    async def send_alerts_to_all_users(self, post: Post, creator: Creator):
         """
         Send alerts to all users tracking this creator.
         
         Args:
-            post: Post information dictionary
-            creator_username: TikTok username
+            post: New post
+            creator: Creator who published the post
         """
         try:
-            # Get creator info
-            creator = self.db.get_tracked_creator_by_username(creator_username)
-            if not creator:
-                logger.warning(f"Creator @{creator_username} not found in database")
-                return
-            
             # For now, we send to the user who added this creator
             # In future, you can extend this to support multiple users per creator
-            telegram_user_id = creator.get('added_by_telegram_user')
+            telegram_user_id = creator.added_by_telegram_user
             
-            if telegram_user_id:
+            if not telegram_user_id:
+                return
+            
+            alert_mode = await self.handlers.get_alert_mode(telegram_user_id)
+            if alert_mode == ALERT_MODE_DIGEST:
+                self.digest.add(telegram_user_id, post)
+            else:
                 await self.send_alert(telegram_user_id, post)
             
         except Exception as e:
-            logger.error(f"Error sending alerts for creator @{creator_username}: {e}")
+            logger.error(f"Error sending alerts for creator @{creator.tiktok_username}: {e}")
+    
+    async def send_creator_suspended(
+        self,
+        telegram_user_id: int,
+        creator_username: str,
+        retry_at: datetime,
+        reason: Optional[str] = None
+    ):
+        """
+        Tell a user that monitoring of a creator is suspended.
+        
+        Args:
+            telegram_user_id: Telegram user ID to send to
+            creator_username: TikTok username
+            retry_at: When the creator will be checked again
+            reason: Last scrape error
+        """
+        try:
+            message = (
+                f"⚠️ Tạm dừng theo dõi @{creator_username}: không thể tải bài viết "
+                f"nhiều lần liên tiếp (tài khoản có thể đã bị xóa, chuyển riêng tư hoặc bị khóa).\n\n"
+                f"🔄 Bot sẽ thử lại lúc {retry_at.strftime('%H:%M %d/%m/%Y')} (UTC)."
+            )
+            if reason:
+                message += f"\n\nLỗi: {reason[:200]}"
+            
+            await self.bot.send_message(chat_id=telegram_user_id, text=message)
+            logger.info(f"Sent suspension notice to user {telegram_user_id} for @{creator_username}")
+            
+        except Exception as e:
+            logger.error(
+                f"Error sending suspension notice: user={telegram_user_id}, "
+                f"creator={creator_username}, error={e}"
+            )
+    
+    async def send_creator_seeded(self, telegram_user_id: int, creator_username: str, post_count: int):
+        """
+        Confirm that a newly added creator was found.
+        
+        Args:
+            telegram_user_id: Telegram user ID to send to
+            creator_username: TikTok username
+            post_count: Number of existing posts found
+        """
+        try:
+            await self.bot.send_message(
+                chat_id=telegram_user_id,
+                text=(
+                    f"🔎 Đã tìm thấy @{creator_username} ({post_count} bài viết gần đây).\n"
+                    f"Các bài viết này sẽ không được thông báo, chỉ bài mới từ bây giờ. 🔔"
+                )
+            )
+        except Exception as e:
+            logger.error(
+                f"Error sending creator confirmation: user={telegram_user_id}, "
+                f"creator={creator_username}, error={e}"
+            )
+    
+    async def send_creator_not_found(
+        self,
+        telegram_user_id: int,
+        creator_username: str,
+        reason: Optional[str] = None
+    ):
+        """
+        Tell a user that a newly added creator could not be fetched.
+        
+        Args:
+            telegram_user_id: Telegram user ID to send to
+            creator_username: TikTok username
+            reason: Scrape error
+        """
+        try:
+            message = (
+                f"⚠️ Không tải được bài viết của @{creator_username}. "
+                f"Hãy kiểm tra lại username (tài khoản có thể không tồn tại hoặc đang ở chế độ riêng tư).\n\n"
+                f"Dùng /remove {creator_username} nếu username bị sai."
+            )
+            if reason:
+                message += f"\n\nLỗi: {reason[:200]}"
+            
+            await self.bot.send_message(chat_id=telegram_user_id, text=message)
+        except Exception as e:
+            logger.error(
+                f"Error sending creator not found notice: user={telegram_user_id}, "
+                f"creator={creator_username}, error={e}"
+            )
+    
+    async def send_digest(self, telegram_user_id: int, posts: List[Post]):
+        """
+        Send a digest of several posts to a Telegram user.
+        
+        Args:
+            telegram_user_id: Telegram user ID to send to
+            posts: New posts
+        """
+        messages = render_digest(posts)
+        sent = 0
+        # One failed message must not drop the rest of the digest
+        for index, message in enumerate(messages, 1):
+            try:
+                await self.bot.send_message(
+                    chat_id=telegram_user_id,
+                    text=message,
+                    parse_mode='Markdown',
+                    disable_web_page_preview=True
+                )
+                sent += 1
+            except Exception as e:
+                logger.error(
+                    f"Error sending digest message {index}/{len(messages)}: "
+                    f"user={telegram_user_id}, error={e}",
+                    exc_info=True
+                )
+        
+        logger.info(
+            f"Sent digest of {len(posts)} posts to user {telegram_user_id} "
+            f"({sent}/{len(messages)} messages)"
+        )
+    
+    async def flush_digests(self, force: bool = False):
+        """
+        Send pending digests.
+        
+        Args:
+            force: Send every pending digest, not only those whose window elapsed
+        """
+        for telegram_user_id, posts in self.digest.pop_due(force=force):
+            await self.send_digest(telegram_user_id, posts)
+    
+    async def run_digest_flusher(self):
+        """Periodically send digests whose collection window has elapsed."""
+        interval = max(1, min(settings.ALERT_DIGEST_WINDOW_SECONDS, 30))
+        
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.flush_digests()
+            except Exception as e:
+                logger.error(f"Error flushing digests: {e}", exc_info=True)
     
     def run(self):
         """Run the bot (blocking)."""
         logger.info("Starting Telegram bot polling...")
-        self.application.run_polling(allowed_updates=['message'])
+        self.application.run_polling(allowed_updates=['message', 'callback_query'])
@@ -0,0 +1,147 @@
+"""Concurrent update processing with per-user ordering."""
+import asyncio
+import logging
+import sys
+import time
+from typing import Any, Awaitable, Dict, Optional
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+logger = logging.getLogger(__name__)
+
+# How often command latency statistics are logged, in seconds
+LATENCY_LOG_SECONDS = 600
+
+# Limit given to the base class, whose semaphore wraps the (final)
+# process_update; the real limit is applied after the per-user lock
+UNLIMITED_UPDATES = sys.maxsize
+
+
+class CommandLatency:
+    """Latency statistics for a single command."""
+    
+    __slots__ = ('count', 'total', 'max')
+    
+    def __init__(self):
+        """Initialize empty statistics."""
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+    
+    def record(self, elapsed: float):
+        """Record one handler run."""
+        self.count += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+    
+    @property
+    def avg(self) -> float:
+        """Average handler latency in seconds."""
+        return self.total / self.count if self.count else 0.0
+
+
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    """
+    Process updates concurrently while keeping each user's updates in order.
+
+    Up to ``max_concurrent_updates`` updates run at the same time. Updates
+    from the same user are serialized with a per-user lock, so ``/add``
+    followed by ``/list`` is always handled in that order. The lock is
+    taken before a concurrency slot, so a user's queued updates wait
+    without holding slots that other users' updates could use.
+    """
+    
+    def __init__(self, max_concurrent_updates: int):
+        """Initialize processor with a concurrency limit."""
+        if max_concurrent_updates < 1:
+            raise ValueError("max_concurrent_updates must be a positive integer")
+        super().__init__(UNLIMITED_UPDATES)
+        self.max_updates = max_concurrent_updates
+        self._slots = asyncio.Semaphore(max_concurrent_updates)
+        self._user_locks: Dict[int, asyncio.Lock] = {}
+        self._lock_users: Dict[int, int] = {}
+        self.latencies: Dict[str, CommandLatency] = {}
+        self._last_latency_log = time.monotonic()
+    
+    async def initialize(self) -> None:
+        """Nothing to allocate."""
+    
+    async def shutdown(self) -> None:
+        """Release per-user state."""
+        self._user_locks.clear()
+        self._lock_users.clear()
+    
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        """Wait for the sender's earlier updates, then for a slot, and run the handler."""
+        command = self._get_command(update)
+        user_id = self._get_user_id(update)
+        if user_id is None:
+            async with self._slots:
+                await self._run_timed(command, coroutine)
+            return
+        
+        lock = self._user_locks.get(user_id)
+        if lock is None:
+            lock = self._user_locks[user_id] = asyncio.Lock()
+        self._lock_users[user_id] = self._lock_users.get(user_id, 0) + 1
+        
+        try:
+            async with lock:
+                async with self._slots:
+                    await self._run_timed(command, coroutine)
+        finally:
+            # Drop the lock once nobody else is queued behind it
+            remaining = self._lock_users[user_id] - 1
+            if remaining:
+                self._lock_users[user_id] = remaining
+            else:
+                del self._lock_users[user_id]
+                del self._user_locks[user_id]
+    
+    async def _run_timed(self, command: str, coroutine: Awaitable[Any]):
+        """Await the handler and record its latency."""
+        start = time.perf_counter()
+        try:
+            await coroutine
+        finally:
+            elapsed = time.perf_counter() - start
+            stats = self.latencies.get(command)
+            if stats is None:
+                stats = self.latencies[command] = CommandLatency()
+            stats.record(elapsed)
+            logger.debug(f"Handled {command} in {elapsed * 1000:.1f} ms")
+            
+            now = time.monotonic()
+            if now - self._last_latency_log >= LATENCY_LOG_SECONDS:
+                self._last_latency_log = now
+                logger.info(f"Command latencies: {self.get_latency_stats()}")
+    
+    def get_latency_stats(self) -> Dict[str, Dict[str, float]]:
+        """Get per-command latency statistics (in milliseconds)."""
+        return {
+            command: {
+                'count': stats.count,
+                'avg_ms': round(stats.avg * 1000, 1),
+                'max_ms': round(stats.max * 1000, 1),
+            }
+            for command, stats in self.latencies.items()
+        }
+    
+    @staticmethod
+    def _get_user_id(update: object) -> Optional[int]:
+        """Get the sender's user ID, if any."""
+        if isinstance(update, Update) and update.effective_user:
+            return update.effective_user.id
+        return None
+    
+    @staticmethod
+    def _get_command(update: object) -> str:
+        """Get the command name of an update (e.g. ``/add``)."""
+        if isinstance(update, Update) and update.effective_message:
+            text = update.effective_message.text or ''
+            if text.startswith('/'):
+                # Strip arguments and the optional @botname suffix
+                return text.split()[0].split('@')[0].lower()
+        return 'other'
@@ -1,4 +1,5 @@
 """Database package."""
-from .supabase_client import SupabaseClient
+from .base import StorageBackend
+from .factory import create_database_client
 
-__all__ = ['SupabaseClient']
+__all__ = ['StorageBackend', 'create_database_client']
@@ -0,0 +1,184 @@
+"""Storage interface shared by the database backends."""
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class StorageBackend(ABC):
+    """Database operations used by the bot, monitor and scheduler."""
+    
+    # ==================== Bot Users ====================
+    
+    @abstractmethod
+    def add_or_update_bot_user(
+        self,
+        telegram_user_id: int,
+        username: Optional[str] = None,
+        first_name: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Add or update a Telegram bot user."""
+    
+    @abstractmethod
+    def get_bot_user(self, telegram_user_id: int) -> Optional[Dict[str, Any]]:
+        """Get a bot user by Telegram user ID."""
+    
+    @abstractmethod
+    def set_alert_mode(self, telegram_user_id: int, alert_mode: str) -> bool:
+        """Set how a bot user receives alerts ('immediate' or 'digest')."""
+    
+    @abstractmethod
+    def get_active_bot_users(self) -> List[Dict[str, Any]]:
+        """Get all active bot users."""
+    
+    # ==================== Tracked Creators ====================
+    
+    @abstractmethod
+    def add_tracked_creator(
+        self,
+        tiktok_username: str,
+        telegram_user_id: int,
+        tiktok_user_id: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Add a TikTok creator to tracking list."""
+    
+    @abstractmethod
+    def add_tracked_creators(
+        self,
+        tiktok_usernames: List[str],
+        telegram_user_id: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Add many TikTok creators in one call.
+
+        Returns:
+            Rows of the creators that were added (tracked ones are skipped)
+        """
+    
+    @abstractmethod
+    def remove_tracked_creator(self, tiktok_username: str, telegram_user_id: int) -> bool:
+        """Remove a TikTok creator from tracking (soft delete)."""
+    
+    @abstractmethod
+    def get_tracked_creators(
+        self,
+        telegram_user_id: Optional[int] = None,
+        include_inactive: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Get tracked creators, optionally filtered by Telegram user."""
+    
+    @abstractmethod
+    def get_tracked_creator_by_username(self, tiktok_username: str) -> Optional[Dict[str, Any]]:
+        """Get a specific tracked creator by username."""
+    
+    # ==================== Creator Health ====================
+    
+    @abstractmethod
+    def get_creator_health(self) -> List[Dict[str, Any]]:
+        """Get circuit breaker state of all creators that have failed."""
+    
+    @abstractmethod
+    def upsert_creator_health(self, health: Dict[str, Any]) -> bool:
+        """Save circuit breaker state of a creator."""
+    
+    # ==================== Posts ====================
+    
+    @abstractmethod
+    def add_post(
+        self,
+        creator_id: str,
+        tiktok_post_id: str,
+        post_url: str,
+        description: Optional[str] = None,
+        hashtags: Optional[List[str]] = None,
+        created_at: Optional[datetime] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Add a new post to the database (None if it already exists)."""
+    
+    @abstractmethod
+    def add_posts(self, posts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Add many posts in one call.
+
+        Args:
+            posts: Dictionaries with the ``add_post`` arguments as keys
+
+        Returns:
+            Rows of the posts that were inserted (existing posts are skipped)
+        """
+    
+    @abstractmethod
+    def post_exists(self, tiktok_post_id: str) -> bool:
+        """Check if a post already exists in the database."""
+    
+    @abstractmethod
+    def get_creator_posts(self, creator_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get recent posts for a creator."""
+    
+    @abstractmethod
+    def search_posts(
+        self,
+        telegram_user_id: int,
+        query: str,
+        limit: int = 5,
+        after: Optional[Tuple[float, str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Full-text search the posts of a user's tracked creators.
+
+        Args:
+            telegram_user_id: Only search creators tracked by this user
+            query: Search terms (web search syntax: "phrase", OR, -word)
+            limit: Max results
+            after: (rank, tiktok_post_id) of the last row of the previous page
+
+        Returns:
+            Post rows with ``tiktok_username`` and ``rank``, best match first
+            (only the newest matches are ranked; ``capped`` is True on every
+            row when older matches were left out)
+        """
+    
+    # ==================== State ====================
+    
+    @abstractmethod
+    def get_state(self, key: str) -> Optional[Any]:
+        """Get a JSON value stored under a key (None if missing)."""
+    
+    @abstractmethod
+    def set_state(self, key: str, value: Any) -> bool:
+        """Store a JSON value under a key."""
+    
+    # ==================== Sync ====================
+    
+    @abstractmethod
+    def ping(self):
+        """
+        Check that the database is reachable.
+
+        Raises:
+            Exception: If the database could not be queried
+        """
+    
+    @abstractmethod
+    def upsert_rows(self, table: str, rows: List[Dict[str, Any]]):
+        """
+        Upsert full rows into a table (used to sync the local store).
+
+        Raises:
+            Exception: If the rows could not be written
+        """
+    
+    @abstractmethod
+    def fetch_mirror_rows(self, posts_per_creator: int) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Fetch every tracked creator, the active creators' recent posts and
+        the active bot users (used to fill the local store).
+
+        Returns:
+            Rows keyed by table: 'tracked_creators', 'posts', 'bot_users'
+
+        Raises:
+            Exception: If any of the rows could not be fetched
+        """
+    
+    def close(self):
+        """Release connections held by the backend."""
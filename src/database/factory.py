@@ -0,0 +1,34 @@
+"""Create the configured storage backend."""
+import logging
+
+from config.settings import settings
+from src.database.base import StorageBackend
+
+logger = logging.getLogger(__name__)
+
+
+def create_database_client() -> StorageBackend:
+    """
+    Create the storage backend selected by ``DATABASE_BACKEND``.
+
+    Backends are imported here so only the selected driver is loaded.
+    When ``LOCAL_STORE_PATH`` is set the backend is wrapped in a
+    :class:`LocalFirstClient`.
+    """
+    backend = settings.DATABASE_BACKEND.lower()
+    
+    if backend == 'postgres':
+        from src.database.postgres_client import PostgresClient
+        client: StorageBackend = PostgresClient()
+    elif backend == 'supabase':
+        from src.database.supabase_client import SupabaseClient
+        client = SupabaseClient()
+    else:
+        raise ValueError(f"Unknown DATABASE_BACKEND: {settings.DATABASE_BACKEND}")
+    
+    if settings.LOCAL_STORE_PATH:
+        from src.database.local_store import LocalStore, LocalFirstClient
+        client = LocalFirstClient(client, LocalStore(settings.LOCAL_STORE_PATH))
+    
+    logger.info(f"Using {backend} database backend (local store: {bool(settings.LOCAL_STORE_PATH)})")
+    return client
@@ -0,0 +1,839 @@
+"""Embedded SQLite store used as a write-through cache in front of the remote database."""
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.database.base import StorageBackend
+
+logger = logging.getLogger(__name__)
+
+LOCAL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracked_creators (
+    id TEXT PRIMARY KEY,
+    tiktok_username TEXT NOT NULL UNIQUE,
+    tiktok_user_id TEXT,
+    added_by_telegram_user INTEGER NOT NULL,
+    created_at TEXT,
+    is_active INTEGER NOT NULL DEFAULT 1
+);
+
+CREATE TABLE IF NOT EXISTS posts (
+    tiktok_post_id TEXT PRIMARY KEY,
+    id TEXT NOT NULL,
+    creator_id TEXT,
+    post_url TEXT NOT NULL,
+    description TEXT,
+    hashtags TEXT NOT NULL DEFAULT '[]',
+    created_at TEXT,
+    scraped_at TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_posts_creator_id ON posts(creator_id, created_at DESC);
+
+CREATE TABLE IF NOT EXISTS bot_users (
+    telegram_user_id INTEGER PRIMARY KEY,
+    username TEXT,
+    first_name TEXT,
+    subscribed_at TEXT,
+    is_active INTEGER NOT NULL DEFAULT 1,
+    alert_mode TEXT NOT NULL DEFAULT 'immediate'
+);
+
+CREATE TABLE IF NOT EXISTS cursors (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS outbox (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_name TEXT NOT NULL,
+    row TEXT NOT NULL
+);
+"""
+
+POST_COLUMNS = (
+    'id', 'creator_id', 'tiktok_post_id', 'post_url', 'description',
+    'hashtags', 'created_at', 'scraped_at'
+)
+
+# Cursor key recording that the store has been filled from the remote database
+HYDRATED_CURSOR = 'local_store.hydrated_at'
+
+# Sync runs a queued write may fail (while the remote answers) before it is dropped
+SYNC_MAX_ATTEMPTS = 5
+
+
+def _now_iso() -> str:
+    """Current UTC time as an ISO string."""
+    return datetime.now(timezone.utc).isoformat()
+
+
+class LocalStore:
+    """
+    SQLite mirror of creators, recent posts, bot users and cursors.
+
+    The database runs in WAL mode so reads never wait on the writer. Every
+    local write also appends the written row to an outbox in the same
+    transaction; the outbox is replayed against the remote database later.
+    """
+    
+    def __init__(self, path: str, posts_per_creator: int = 200):
+        """Open (or create) the store at ``path``."""
+        self.path = path
+        self.posts_per_creator = posts_per_creator
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(LOCAL_SCHEMA)
+        logger.info(f"Local store opened at {path}")
+    
+    def close(self):
+        """Close the database connection."""
+        with self.lock:
+            self.conn.close()
+    
+    # ==================== Row conversion ====================
+    
+    @staticmethod
+    def _creator_from_row(row: sqlite3.Row) -> Dict[str, Any]:
+        creator = dict(row)
+        creator['is_active'] = bool(creator['is_active'])
+        return creator
+    
+    @staticmethod
+    def _post_from_row(row: sqlite3.Row) -> Dict[str, Any]:
+        post = dict(row)
+        post['hashtags'] = json.loads(post['hashtags'])
+        return post
+    
+    @staticmethod
+    def _bot_user_from_row(row: sqlite3.Row) -> Dict[str, Any]:
+        bot_user = dict(row)
+        bot_user['is_active'] = bool(bot_user['is_active'])
+        return bot_user
+    
+    def _enqueue(self, table_name: str, row: Dict[str, Any]):
+        """Append a row to the outbox (caller holds the lock and transaction)."""
+        self.conn.execute(
+            'INSERT INTO outbox (table_name, row) VALUES (?, ?)',
+            (table_name, json.dumps(row, default=str))
+        )
+    
+    # ==================== Bot Users ====================
+    
+    def upsert_bot_user(
+        self,
+        telegram_user_id: int,
+        username: Optional[str],
+        first_name: Optional[str]
+    ) -> Dict[str, Any]:
+        """Add or update a bot user, keeping its alert mode."""
+        with self.lock:
+            self.conn.execute('BEGIN')
+            try:
+                self.conn.execute(
+                    'INSERT INTO bot_users (telegram_user_id, username, first_name, subscribed_at, is_active) '
+                    'VALUES (?, ?, ?, ?, 1) '
+                    'ON CONFLICT (telegram_user_id) DO UPDATE SET '
+                    'username = excluded.username, first_name = excluded.first_name, is_active = 1',
+                    (telegram_user_id, username, first_name, _now_iso())
+                )
+                bot_user = self._get_bot_user(telegram_user_id)
+                self._enqueue('bot_users', bot_user)
+                self.conn.execute('COMMIT')
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+            return bot_user
+    
+    def get_bot_user(self, telegram_user_id: int) -> Optional[Dict[str, Any]]:
+        """Get a bot user."""
+        with self.lock:
+            return self._get_bot_user(telegram_user_id)
+    
+    def _get_bot_user(self, telegram_user_id: int) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute(
+            'SELECT * FROM bot_users WHERE telegram_user_id = ?', (telegram_user_id,)
+        ).fetchone()
+        return self._bot_user_from_row(row) if row else None
+    
+    def set_alert_mode(self, telegram_user_id: int, alert_mode: str) -> bool:
+        """Set a bot user's alert mode."""
+        with self.lock:
+            self.conn.execute('BEGIN')
+            try:
+                cursor = self.conn.execute(
+                    'UPDATE bot_users SET alert_mode = ? WHERE telegram_user_id = ?',
+                    (alert_mode, telegram_user_id)
+                )
+                if cursor.rowcount:
+                    self._enqueue('bot_users', self._get_bot_user(telegram_user_id))
+                self.conn.execute('COMMIT')
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+            return bool(cursor.rowcount)
+    
+    def get_active_bot_users(self) -> List[Dict[str, Any]]:
+        """Get all active bot users."""
+        with self.lock:
+            rows = self.conn.execute('SELECT * FROM bot_users WHERE is_active = 1').fetchall()
+        return [self._bot_user_from_row(row) for row in rows]
+    
+    # ==================== Tracked Creators ====================
+    
+    def add_tracked_creator(
+        self,
+        tiktok_username: str,
+        telegram_user_id: int,
+        tiktok_user_id: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Add a creator, or re-activate a previously removed one.
+
+        Returns:
+            The creator row, or None if the creator is already tracked
+        """
+        with self.lock:
+            self.conn.execute('BEGIN')
+            try:
+                creator = self._insert_creator(tiktok_username.lower(), telegram_user_id, tiktok_user_id)
+                self.conn.execute('COMMIT')
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+            return creator
+    
+    def add_tracked_creators(
+        self,
+        tiktok_usernames: List[str],
+        telegram_user_id: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Add many creators in one transaction.
+
+        Returns:
+            The rows of creators that were not tracked yet
+        """
+        added = []
+        with self.lock:
+            self.conn.execute('BEGIN')
+            try:
+                for tiktok_username in tiktok_usernames:
+                    creator = self._insert_creator(tiktok_username.lower(), telegram_user_id, None)
+                    if creator:
+                        added.append(creator)
+                self.conn.execute('COMMIT')
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+        return added
+    
+    def _insert_creator(
+        self,
+        tiktok_username: str,
+        telegram_user_id: int,
+        tiktok_user_id: Optional[str]
+    ) -> Optional[Dict[str, Any]]:
+        """Insert or re-activate a creator inside an open transaction."""
+        existing = self._get_creator(tiktok_username)
+        if existing and existing['is_active']:
+            return None
+        
+        if existing:
+            self.conn.execute(
+                'UPDATE tracked_creators SET added_by_telegram_user = ?, '
+                'tiktok_user_id = COALESCE(?, tiktok_user_id), is_active = 1 WHERE id = ?',
+                (telegram_user_id, tiktok_user_id, existing['id'])
+            )
+        else:
+            self.conn.execute(
+                'INSERT INTO tracked_creators '
+                '(id, tiktok_username, tiktok_user_id, added_by_telegram_user, created_at, is_active) '
+                'VALUES (?, ?, ?, ?, ?, 1)',
+                (str(uuid.uuid4()), tiktok_username, tiktok_user_id, telegram_user_id, _now_iso())
+            )
+        
+        creator = self._get_creator(tiktok_username)
+        self._enqueue('tracked_creators', creator)
+        return creator
+    
+    def remove_tracked_creator(self, tiktok_username: str, telegram_user_id: int) -> bool:
+        """Soft-delete a creator added by a user."""
+        tiktok_username = tiktok_username.lower()
+        with self.lock:
+            self.conn.execute('BEGIN')
+            try:
+                cursor = self.conn.execute(
+                    'UPDATE tracked_creators SET is_active = 0 '
+                    'WHERE tiktok_username = ? AND added_by_telegram_user = ? AND is_active = 1',
+                    (tiktok_username, telegram_user_id)
+                )
+                if cursor.rowcount:
+                    self._enqueue('tracked_creators', self._get_creator(tiktok_username))
+                self.conn.execute('COMMIT')
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+            return bool(cursor.rowcount)
+    
+    def get_tracked_creators(self, telegram_user_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get active creators, optionally filtered by Telegram user."""
+        query = 'SELECT * FROM tracked_creators WHERE is_active = 1'
+        params: Tuple[Any, ...] = ()
+        if telegram_user_id:
+            query += ' AND added_by_telegram_user = ?'
+            params = (telegram_user_id,)
+        
+        with self.lock:
+            rows = self.conn.execute(query + ' ORDER BY created_at', params).fetchall()
+        return [self._creator_from_row(row) for row in rows]
+    
+    def get_tracked_creator_by_username(self, tiktok_username: str) -> Optional[Dict[str, Any]]:
+        """Get an active creator by username."""
+        with self.lock:
+            creator = self._get_creator(tiktok_username.lower())
+        return creator if creator and creator['is_active'] else None
+    
+    def _get_creator(self, tiktok_username: str) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute(
+            'SELECT * FROM tracked_creators WHERE tiktok_username = ?', (tiktok_username,)
+        ).fetchone()
+        return self._creator_from_row(row) if row else None
+    
+    # ==================== Posts ====================
+    
+    def add_post(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Add a post.
+
+        Returns:
+            The post row, or None if the post already exists
+        """
+        inserted = self.add_posts([data])
+        return inserted[0] if inserted else None
+    
+    def add_posts(self, posts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Add many posts in one transaction.
+
+        Returns:
+            The rows of posts that did not exist yet
+        """
+        inserted = []
+        with self.lock:
+            self.conn.execute('BEGIN')
+            try:
+                for data in posts:
+                    post = dict(data, id=str(uuid.uuid4()), scraped_at=_now_iso())
+                    cursor = self.conn.execute(
+                        f'INSERT OR IGNORE INTO posts ({", ".join(POST_COLUMNS)}) '
+                        f'VALUES ({", ".join("?" * len(POST_COLUMNS))})',
+                        tuple(
+                            json.dumps(post[column]) if column == 'hashtags' else post[column]
+                            for column in POST_COLUMNS
+                        )
+                    )
+                    if cursor.rowcount:
+                        self._enqueue('posts', post)
+                        inserted.append(post)
+                self.conn.execute('COMMIT')
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+        return inserted
+    
+    def post_exists(self, tiktok_post_id: str) -> bool:
+        """Check if a post is stored."""
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT 1 FROM posts WHERE tiktok_post_id = ?', (tiktok_post_id,)
+            ).fetchone()
+        return row is not None
+    
+    def get_creator_posts(self, creator_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get recent posts of a creator."""
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT * FROM posts WHERE creator_id = ? '
+                'ORDER BY created_at DESC, scraped_at DESC LIMIT ?',
+                (creator_id, limit)
+            ).fetchall()
+        return [self._post_from_row(row) for row in rows]
+    
+    def prune_posts(self):
+        """Keep only the newest ``posts_per_creator`` posts of each creator."""
+        with self.lock:
+            self.conn.execute(
+                'DELETE FROM posts WHERE tiktok_post_id IN ('
+                '  SELECT tiktok_post_id FROM ('
+                '    SELECT tiktok_post_id, ROW_NUMBER() OVER ('
+                '      PARTITION BY creator_id ORDER BY created_at DESC, scraped_at DESC'
+                '    ) AS rank FROM posts'
+                '  ) WHERE rank > ?'
+                ')',
+                (self.posts_per_creator,)
+            )
+    
+    # ==================== Cursors ====================
+    
+    def get_cursor(self, key: str) -> Optional[Any]:
+        """Get a JSON value stored under a key."""
+        with self.lock:
+            row = self.conn.execute('SELECT value FROM cursors WHERE key = ?', (key,)).fetchone()
+        return json.loads(row['value']) if row else None
+    
+    def set_cursor(self, key: str, value: Any):
+        """Store a JSON value under a key."""
+        with self.lock:
+            self.conn.execute(
+                'INSERT INTO cursors (key, value, updated_at) VALUES (?, ?, ?) '
+                'ON CONFLICT (key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at',
+                (key, json.dumps(value, default=str), time.time())
+            )
+    
+    # ==================== Outbox ====================
+    
+    def pending_writes(self, limit: int = 500) -> List[Tuple[int, str, Dict[str, Any]]]:
+        """Get the oldest queued writes as (seq, table_name, row)."""
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT seq, table_name, row FROM outbox ORDER BY seq LIMIT ?', (limit,)
+            ).fetchall()
+        return [(row['seq'], row['table_name'], json.loads(row['row'])) for row in rows]
+    
+    def pending_count(self) -> int:
+        """Number of queued writes."""
+        with self.lock:
+            return self.conn.execute('SELECT COUNT(*) FROM outbox').fetchone()[0]
+    
+    def ack_writes(self, seqs: List[int]):
+        """Remove synced writes from the outbox."""
+        with self.lock:
+            self.conn.executemany('DELETE FROM outbox WHERE seq = ?', [(seq,) for seq in seqs])
+    
+    # ==================== Hydration ====================
+    
+    def replace_from_remote(
+        self,
+        creators: List[Dict[str, Any]],
+        posts: List[Dict[str, Any]],
+        bot_users: List[Dict[str, Any]]
+    ) -> bool:
+        """
+        Overwrite the mirror with rows fetched from the remote database.
+
+        Skipped (returns False) while local writes are still queued, so
+        unsynced changes are never overwritten by older remote data.
+        """
+        with self.lock:
+            if self.pending_count():
+                return False
+            
+            self.conn.execute('BEGIN')
+            try:
+                self.conn.executemany(
+                    'INSERT OR REPLACE INTO tracked_creators '
+                    '(id, tiktok_username, tiktok_user_id, added_by_telegram_user, created_at, is_active) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    [
+                        (c['id'], c['tiktok_username'], c.get('tiktok_user_id'),
+                         c['added_by_telegram_user'], c.get('created_at'), int(bool(c.get('is_active', True))))
+                        for c in creators
+                    ]
+                )
+                self.conn.executemany(
+                    f'INSERT OR IGNORE INTO posts ({", ".join(POST_COLUMNS)}) '
+                    f'VALUES ({", ".join("?" * len(POST_COLUMNS))})',
+                    [
+                        tuple(
+                            json.dumps(p.get(column) or []) if column == 'hashtags' else p.get(column)
+                            for column in POST_COLUMNS
+                        )
+                        for p in posts
+                    ]
+                )
+                self.conn.executemany(
+                    'INSERT OR REPLACE INTO bot_users '
+                    '(telegram_user_id, username, first_name, subscribed_at, is_active, alert_mode) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    [
+                        (u['telegram_user_id'], u.get('username'), u.get('first_name'),
+                         u.get('subscribed_at'), int(bool(u.get('is_active', True))),
+                         u.get('alert_mode') or 'immediate')
+                        for u in bot_users
+                    ]
+                )
+                self.conn.execute('COMMIT')
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+        
+        self.set_cursor(HYDRATED_CURSOR, _now_iso())
+        return True
+    
+    @property
+    def hydrated(self) -> bool:
+        """Whether the store has been filled from the remote database at least once."""
+        return self.get_cursor(HYDRATED_CURSOR) is not None
+
+
+class LocalFirstClient(StorageBackend):
+    """
+    Storage backend that serves reads from a :class:`LocalStore`.
+
+    Wraps a remote backend. Hot-path reads and writes go to the local
+    store; writes are queued and synced to the remote backend in the
+    background, so monitoring keeps working while the remote database is
+    unreachable. Cold-path methods go straight to the remote backend.
+    """
+    
+    def __init__(self, remote: StorageBackend, store: LocalStore, posts_per_creator: int = 50):
+        """Initialize with a remote client and a local store."""
+        self.remote = remote
+        self.store = store
+        self.posts_per_creator = posts_per_creator
+        # Failed sync runs per outbox seq
+        self.sync_attempts: Dict[int, int] = {}
+        self.ready = store.hydrated
+        if self.ready:
+            logger.info("Serving reads from local store (synced by a previous run)")
+    
+    def close(self):
+        """Close the local store and the remote backend."""
+        self.store.close()
+        self.remote.close()
+    
+    # ==================== Bot Users ====================
+    
+    def add_or_update_bot_user(
+        self,
+        telegram_user_id: int,
+        username: Optional[str] = None,
+        first_name: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Add or update a Telegram bot user."""
+        return self.store.upsert_bot_user(telegram_user_id, username, first_name)
+    
+    def get_bot_user(self, telegram_user_id: int) -> Optional[Dict[str, Any]]:
+        """Get a bot user by Telegram user ID."""
+        if not self.ready:
+            return self.remote.get_bot_user(telegram_user_id)
+        return self.store.get_bot_user(telegram_user_id)
+    
+    def set_alert_mode(self, telegram_user_id: int, alert_mode: str) -> bool:
+        """Set how a bot user receives alerts."""
+        if not self.ready:
+            return self.remote.set_alert_mode(telegram_user_id, alert_mode)
+        return self.store.set_alert_mode(telegram_user_id, alert_mode)
+    
+    def get_active_bot_users(self) -> List[Dict[str, Any]]:
+        """Get all active bot users."""
+        if not self.ready:
+            return self.remote.get_active_bot_users()
+        return self.store.get_active_bot_users()
+    
+    # ==================== Tracked Creators ====================
+    
+    def add_tracked_creator(
+        self,
+        tiktok_username: str,
+        telegram_user_id: int,
+        tiktok_user_id: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Add a TikTok creator to tracking list."""
+        if not self.ready:
+            return self.remote.add_tracked_creator(tiktok_username, telegram_user_id, tiktok_user_id)
+        result = self.store.add_tracked_creator(tiktok_username, telegram_user_id, tiktok_user_id)
+        if result:
+            logger.info(f"Added tracked creator: {tiktok_username}")
+        return result
+    
+    def add_tracked_creators(
+        self,
+        tiktok_usernames: List[str],
+        telegram_user_id: int
+    ) -> List[Dict[str, Any]]:
+        """Add many TikTok creators, skipping usernames that are already tracked."""
+        if not self.ready:
+            return self.remote.add_tracked_creators(tiktok_usernames, telegram_user_id)
+        added = self.store.add_tracked_creators(tiktok_usernames, telegram_user_id)
+        logger.info(f"Added {len(added)} of {len(tiktok_usernames)} tracked creators")
+        return added
+    
+    def remove_tracked_creator(self, tiktok_username: str, telegram_user_id: int) -> bool:
+        """Remove a TikTok creator from tracking (soft delete)."""
+        if not self.ready:
+            return self.remote.remove_tracked_creator(tiktok_username, telegram_user_id)
+        success = self.store.remove_tracked_creator(tiktok_username, telegram_user_id)
+        if success:
+            logger.info(f"Removed tracked creator: {tiktok_username}")
+        return success
+    
+    def get_tracked_creators(
+        self,
+        telegram_user_id: Optional[int] = None,
+        include_inactive: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Get tracked creators, optionally filtered by Telegram user."""
+        if not self.ready or include_inactive:
+            return self.remote.get_tracked_creators(telegram_user_id, include_inactive)
+        return self.store.get_tracked_creators(telegram_user_id)
+    
+    def get_tracked_creator_by_username(self, tiktok_username: str) -> Optional[Dict[str, Any]]:
+        """Get a specific tracked creator by username."""
+        if not self.ready:
+            return self.remote.get_tracked_creator_by_username(tiktok_username)
+        return self.store.get_tracked_creator_by_username(tiktok_username)
+    
+    # ==================== Creator Health ====================
+    
+    def get_creator_health(self) -> List[Dict[str, Any]]:
+        """Get circuit breaker state of all creators that have failed."""
+        return self.remote.get_creator_health()
+    
+    def upsert_creator_health(self, health: Dict[str, Any]) -> bool:
+        """Save circuit breaker state of a creator."""
+        return self.remote.upsert_creator_health(health)
+    
+    # ==================== Posts ====================
+    
+    def add_post(
+        self,
+        creator_id: str,
+        tiktok_post_id: str,
+        post_url: str,
+        description: Optional[str] = None,
+        hashtags: Optional[List[str]] = None,
+        created_at: Optional[datetime] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Add a new post (None if it already exists)."""
+        if not self.ready:
+            return self.remote.add_post(
+                creator_id, tiktok_post_id, post_url, description, hashtags, created_at
+            )
+        result = self.store.add_post({
+            'creator_id': creator_id,
+            'tiktok_post_id': tiktok_post_id,
+            'post_url': post_url,
+            'description': description,
+            'hashtags': hashtags or [],
+            'created_at': created_at.isoformat() if created_at else None
+        })
+        if result:
+            logger.debug(f"Added post: {tiktok_post_id}")
+        return result
+    
+    def add_posts(self, posts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Add many posts, skipping posts that already exist."""
+        if not self.ready:
+            return self.remote.add_posts(posts)
+        return self.store.add_posts([
+            {
+                'creator_id': post['creator_id'],
+                'tiktok_post_id': post['tiktok_post_id'],
+                'post_url': post['post_url'],
+                'description': post.get('description'),
+                'hashtags': post.get('hashtags') or [],
+                'created_at': post['created_at'].isoformat() if post.get('created_at') else None
+            }
+            for post in posts
+        ])
+    
+    def post_exists(self, tiktok_post_id: str) -> bool:
+        """Check if a post already exists."""
+        if not self.ready:
+            return self.remote.post_exists(tiktok_post_id)
+        return self.store.post_exists(tiktok_post_id)
+    
+    def get_creator_posts(self, creator_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get recent posts for a creator."""
+        if not self.ready:
+            return self.remote.get_creator_posts(creator_id, limit)
+        return self.store.get_creator_posts(creator_id, limit)
+    
+    def search_posts(
+        self,
+        telegram_user_id: int,
+        query: str,
+        limit: int = 5,
+        after: Optional[Tuple[float, str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Full-text search posts (the local store only keeps recent posts, so ask the remote)."""
+        return self.remote.search_posts(telegram_user_id, query, limit, after)
+    
+    # ==================== State ====================
+    
+    def get_state(self, key: str) -> Optional[Any]:
+        """Get a JSON value stored under a key (kept locally, not synced)."""
+        return self.store.get_cursor(key)
+    
+    def set_state(self, key: str, value: Any) -> bool:
+        """Store a JSON value under a key (kept locally, not synced)."""
+        self.store.set_cursor(key, value)
+        return True
+    
+    # ==================== Sync ====================
+    
+    def ping(self):
+        """Check that the remote database is reachable."""
+        self.remote.ping()
+    
+    def upsert_rows(self, table: str, rows: List[Dict[str, Any]]):
+        """Upsert rows directly into the remote database."""
+        self.remote.upsert_rows(table, rows)
+    
+    def fetch_mirror_rows(self, posts_per_creator: int) -> Dict[str, List[Dict[str, Any]]]:
+        """Fetch the rows that fill the local store from the remote database."""
+        return self.remote.fetch_mirror_rows(posts_per_creator)
+    
+    def sync_pending(self) -> int:
+        """
+        Replay queued writes against the remote database.
+
+        Consecutive writes to the same table are sent as one batch. If a
+        batch fails its rows are retried one by one. Syncing stops at the
+        first row that still fails, so later writes never overtake it; the
+        row is retried on the next run and dropped only after failing
+        ``SYNC_MAX_ATTEMPTS`` runs while the remote database answers a ping.
+
+        Returns:
+            Number of writes synced
+        """
+        synced = 0
+        pending = self.store.pending_writes()
+        
+        while pending:
+            index = 0
+            while index < len(pending):
+                table_name = pending[index][1]
+                batch = []
+                while index < len(pending) and pending[index][1] == table_name:
+                    batch.append(pending[index])
+                    index += 1
+                
+                try:
+                    self.remote.upsert_rows(table_name, [row for _, _, row in batch])
+                    acked, blocked = [seq for seq, _, _ in batch], False
+                except Exception as e:
+                    logger.debug(f"Batch sync of {table_name} failed, retrying rows: {e}")
+                    acked, blocked = self._sync_rows(table_name, batch)
+                
+                self.store.ack_writes(acked)
+                synced += len(acked)
+                for seq in acked:
+                    self.sync_attempts.pop(seq, None)
+                
+                if blocked:
+                    logger.warning(f"Sync paused, {self.store.pending_count()} writes queued")
+                    return synced
+            
+            pending = self.store.pending_writes()
+        
+        if synced:
+            logger.info(f"Synced {synced} writes to remote database")
+        return synced
+    
+    def _sync_rows(
+        self,
+        table_name: str,
+        batch: List[Tuple[int, str, Dict[str, Any]]]
+    ) -> Tuple[List[int], bool]:
+        """
+        Sync rows one by one, stopping at the first row that must be retried.
+
+        Returns:
+            Seqs to remove from the outbox (synced or dropped rows), and
+            whether syncing has to stop until the next run
+        """
+        acked = []
+        for seq, _, row in batch:
+            try:
+                self.remote.upsert_rows(table_name, [row])
+                acked.append(seq)
+                continue
+            except Exception as e:
+                error = e
+        
+            try:
+                self.remote.ping()
+            except Exception:
+                logger.warning(f"Remote database unreachable: {error}")
+                return acked, True
+        
+            attempts = self.sync_attempts.get(seq, 0) + 1
+            if attempts < SYNC_MAX_ATTEMPTS:
+                self.sync_attempts[seq] = attempts
+                logger.warning(
+                    f"Syncing {table_name} row failed ({attempts}/{SYNC_MAX_ATTEMPTS}), "
+                    f"retrying next run: {error}"
+                )
+                return acked, True
+            
+            logger.error(
+                f"Remote rejected {table_name} row {SYNC_MAX_ATTEMPTS} times, "
+                f"dropping it: row={row}, error={error}"
+            )
+            acked.append(seq)
+        
+        return acked, False
+    
+    def refresh_from_remote(self) -> bool:
+        """
+        Reload creators, recent posts and bot users from the remote database.
+
+        The mirror is only replaced (and marked hydrated) when every row was
+        fetched, so a failed or partial fetch never leaves it incomplete.
+
+        Returns:
+            True if the local store was refreshed
+        """
+        try:
+            rows = self.remote.fetch_mirror_rows(self.posts_per_creator)
+        except Exception as e:
+            logger.error(f"Error refreshing local store: {e}")
+            return False
+        
+        creators, posts, bot_users = rows['tracked_creators'], rows['posts'], rows['bot_users']
+        if not self.store.replace_from_remote(creators, posts, bot_users):
+            logger.debug("Local writes pending, skipping refresh")
+            return False
+        
+        self.store.prune_posts()
+        if not self.ready:
+            logger.info("Local store hydrated, serving reads locally")
+        self.ready = True
+        logger.info(f"Local store refreshed: {len(creators)} creators, {len(posts)} posts")
+        return True
+    
+    async def run_sync_loop(self, sync_seconds: int, refresh_minutes: int):
+        """Background task that syncs queued writes and refreshes the mirror."""
+        last_refresh = None
+        
+        while True:
+            try:
+                await asyncio.to_thread(self.sync_pending)
+                
+                refresh_due = (
+                    last_refresh is None
+                    or time.monotonic() - last_refresh >= refresh_minutes * 60
+                )
+                # Only refresh once every local write has reached the remote
+                if refresh_due and not self.store.pending_count():
+                    await asyncio.to_thread(self.refresh_from_remote)
+                    last_refresh = time.monotonic()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in local store sync: {e}", exc_info=True)
+            
+            await asyncio.sleep(sync_seconds)
@@ -0,0 +1,458 @@
+"""Direct Postgres backend using a pooled asyncpg connection."""
+import asyncio
+import json
+import logging
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.settings import settings
+from src.database.base import StorageBackend
+
+logger = logging.getLogger(__name__)
+
+POST_COLUMNS = ('creator_id', 'tiktok_post_id', 'post_url', 'description', 'hashtags', 'created_at')
+
+# Primary key of each table that can be synced with upsert_rows
+PRIMARY_KEYS = {
+    'tracked_creators': 'id',
+    'posts': 'tiktok_post_id',
+    'bot_users': 'telegram_user_id',
+    'creator_health': 'tiktok_username',
+}
+
+# Re-activates a removed creator for the new owner; active creators are left alone
+REACTIVATE_CREATOR = (
+    'ON CONFLICT (tiktok_username) DO UPDATE SET is_active = TRUE, '
+    'added_by_telegram_user = EXCLUDED.added_by_telegram_user, '
+    'tiktok_user_id = COALESCE(EXCLUDED.tiktok_user_id, tracked_creators.tiktok_user_id) '
+    'WHERE tracked_creators.is_active = FALSE'
+)
+
+# Post columns kept by the local store (leaves out the search vector)
+MIRROR_POST_COLUMNS = 'id, creator_id, tiktok_post_id, post_url, description, hashtags, created_at, scraped_at'
+
+TIMESTAMP_COLUMNS = {'created_at', 'scraped_at', 'subscribed_at', 'open_until', 'updated_at'}
+
+
+def _record_to_dict(record) -> Dict[str, Any]:
+    """Convert an asyncpg record to the JSON-like shape PostgREST returns."""
+    row = {}
+    for key, value in record.items():
+        if isinstance(value, uuid.UUID):
+            value = str(value)
+        elif isinstance(value, datetime):
+            value = value.isoformat()
+        row[key] = value
+    return row
+
+
+def _to_db_value(column: str, value: Any) -> Any:
+    """Convert JSON-like values (ISO timestamps) to what asyncpg expects."""
+    if column in TIMESTAMP_COLUMNS and isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime) and value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class PostgresClient(StorageBackend):
+    """
+    Postgres backend talking to the database directly with asyncpg.
+
+    Queries run on a connection pool owned by a private event loop in a
+    background thread, so the synchronous interface can be called from
+    worker threads like the Supabase client. asyncpg prepares and caches
+    every parameterized statement per connection, and bulk post inserts
+    use ``COPY`` into a staging table.
+    """
+    
+    def __init__(
+        self,
+        dsn: Optional[str] = None,
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None
+    ):
+        """Connect to Postgres and create the pool."""
+        try:
+            import asyncpg
+        except ImportError as e:
+            raise ImportError("asyncpg is required for DATABASE_BACKEND=postgres") from e
+        
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name='postgres-client', daemon=True
+        )
+        self._thread.start()
+        
+        # create_pool returns an awaitable Pool, not a coroutine, so wrap it
+        async def create_pool():
+            return await asyncpg.create_pool(
+                dsn or settings.DATABASE_URL,
+                min_size=min_size or settings.DATABASE_POOL_MIN_SIZE,
+                max_size=max_size or settings.DATABASE_POOL_MAX_SIZE
+            )
+        
+        self.pool = self._run(create_pool())
+        logger.info("Postgres client initialized")
+    
+    def _run(self, coro):
+        """Run a coroutine on the client's event loop and wait for the result."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+    
+    def _fetch(self, query: str, *args) -> List[Dict[str, Any]]:
+        return [_record_to_dict(record) for record in self._run(self.pool.fetch(query, *args))]
+    
+    def _fetchrow(self, query: str, *args) -> Optional[Dict[str, Any]]:
+        record = self._run(self.pool.fetchrow(query, *args))
+        return _record_to_dict(record) if record else None
+    
+    def close(self):
+        """Close the pool and stop the event loop."""
+        self._run(self.pool.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+    
+    # ==================== Bot Users ====================
+    
+    def add_or_update_bot_user(
+        self,
+        telegram_user_id: int,
+        username: Optional[str] = None,
+        first_name: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Add or update a Telegram bot user."""
+        try:
+            row = self._fetchrow(
+                'INSERT INTO bot_users (telegram_user_id, username, first_name, is_active) '
+                'VALUES ($1, $2, $3, TRUE) '
+                'ON CONFLICT (telegram_user_id) DO UPDATE SET '
+                'username = EXCLUDED.username, first_name = EXCLUDED.first_name, is_active = TRUE '
+                'RETURNING *',
+                telegram_user_id, username, first_name
+            )
+            logger.info(f"Added/updated bot user: {telegram_user_id}")
+            return row or {}
+        except Exception as e:
+            logger.error(f"Error adding/updating bot user {telegram_user_id}: {e}")
+            raise
+    
+    def get_bot_user(self, telegram_user_id: int) -> Optional[Dict[str, Any]]:
+        """Get a bot user by Telegram user ID."""
+        try:
+            return self._fetchrow('SELECT * FROM bot_users WHERE telegram_user_id = $1', telegram_user_id)
+        except Exception as e:
+            logger.error(f"Error fetching bot user {telegram_user_id}: {e}")
+            return None
+    
+    def set_alert_mode(self, telegram_user_id: int, alert_mode: str) -> bool:
+        """Set how a bot user receives alerts ('immediate' or 'digest')."""
+        try:
+            row = self._fetchrow(
+                'UPDATE bot_users SET alert_mode = $2 WHERE telegram_user_id = $1 RETURNING telegram_user_id',
+                telegram_user_id, alert_mode
+            )
+            if row:
+                logger.info(f"Set alert mode for bot user {telegram_user_id}: {alert_mode}")
+                return True
+            return False
+        except Exception as e:
+            logger.error(f"Error setting alert mode for bot user {telegram_user_id}: {e}")
+            return False
+    
+    def get_active_bot_users(self) -> List[Dict[str, Any]]:
+        """Get all active bot users."""
+        try:
+            return self._fetch('SELECT * FROM bot_users WHERE is_active = TRUE')
+        except Exception as e:
+            logger.error(f"Error fetching active bot users: {e}")
+            return []
+    
+    # ==================== Tracked Creators ====================
+    
+    def add_tracked_creator(
+        self,
+        tiktok_username: str,
+        telegram_user_id: int,
+        tiktok_user_id: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Add a TikTok creator to tracking list."""
+        try:
+            row = self._fetchrow(
+                'INSERT INTO tracked_creators (tiktok_username, tiktok_user_id, added_by_telegram_user, is_active) '
+                'VALUES ($1, $2, $3, TRUE) '
+                f'{REACTIVATE_CREATOR} RETURNING *',
+                tiktok_username.lower(), tiktok_user_id, telegram_user_id
+            )
+            if row:
+                logger.info(f"Added tracked creator: {tiktok_username}")
+            return row
+        except Exception as e:
+            logger.error(f"Error adding tracked creator {tiktok_username}: {e}")
+            return None
+    
+    def add_tracked_creators(
+        self,
+        tiktok_usernames: List[str],
+        telegram_user_id: int
+    ) -> List[Dict[str, Any]]:
+        """Add many TikTok creators, skipping usernames that are already tracked."""
+        if not tiktok_usernames:
+            return []
+        
+        try:
+            rows = self._fetch(
+                'INSERT INTO tracked_creators (tiktok_username, added_by_telegram_user, is_active) '
+                'SELECT username, $2, TRUE FROM unnest($1::text[]) AS username '
+                f'{REACTIVATE_CREATOR} RETURNING *',
+                # DO UPDATE fails if a username appears twice in one statement
+                list(dict.fromkeys(tiktok_username.lower() for tiktok_username in tiktok_usernames)),
+                telegram_user_id
+            )
+            logger.info(f"Added {len(rows)} of {len(tiktok_usernames)} tracked creators")
+            return rows
+        except Exception as e:
+            logger.error(f"Error adding {len(tiktok_usernames)} tracked creators: {e}")
+            return []
+    
+    def remove_tracked_creator(self, tiktok_username: str, telegram_user_id: int) -> bool:
+        """Remove a TikTok creator from tracking (soft delete)."""
+        try:
+            rows = self._fetch(
+                'UPDATE tracked_creators SET is_active = FALSE '
+                'WHERE tiktok_username = $1 AND added_by_telegram_user = $2 AND is_active = TRUE '
+                'RETURNING id',
+                tiktok_username.lower(), telegram_user_id
+            )
+            if rows:
+                logger.info(f"Removed tracked creator: {tiktok_username}")
+                return True
+            return False
+        except Exception as e:
+            logger.error(f"Error removing tracked creator {tiktok_username}: {e}")
+            return False
+    
+    def get_tracked_creators(
+        self,
+        telegram_user_id: Optional[int] = None,
+        include_inactive: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Get tracked creators, optionally filtered by Telegram user."""
+        try:
+            return self._fetch(
+                'SELECT * FROM tracked_creators '
+                'WHERE ($1 OR is_active = TRUE) '
+                'AND ($2::BIGINT IS NULL OR added_by_telegram_user = $2) '
+                'ORDER BY created_at',
+                include_inactive, telegram_user_id or None
+            )
+        except Exception as e:
+            logger.error(f"Error fetching tracked creators: {e}")
+            return []
+    
+    def get_tracked_creator_by_username(self, tiktok_username: str) -> Optional[Dict[str, Any]]:
+        """Get a specific tracked creator by username."""
+        try:
+            return self._fetchrow(
+                'SELECT * FROM tracked_creators WHERE tiktok_username = $1 AND is_active = TRUE',
+                tiktok_username.lower()
+            )
+        except Exception as e:
+            logger.error(f"Error fetching creator {tiktok_username}: {e}")
+            return None
+    
+    # ==================== Creator Health ====================
+    
+    def get_creator_health(self) -> List[Dict[str, Any]]:
+        """Get circuit breaker state of all creators that have failed."""
+        try:
+            return self._fetch('SELECT * FROM creator_health')
+        except Exception as e:
+            logger.error(f"Error fetching creator health: {e}")
+            return []
+    
+    def upsert_creator_health(self, health: Dict[str, Any]) -> bool:
+        """Save circuit breaker state of a creator."""
+        try:
+            self.upsert_rows('creator_health', [dict(health, updated_at=datetime.now(timezone.utc))])
+            return True
+        except Exception as e:
+            logger.error(f"Error saving health of creator {health.get('tiktok_username')}: {e}")
+            return False
+    
+    # ==================== Posts ====================
+    
+    def add_post(
+        self,
+        creator_id: str,
+        tiktok_post_id: str,
+        post_url: str,
+        description: Optional[str] = None,
+        hashtags: Optional[List[str]] = None,
+        created_at: Optional[datetime] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Add a new post to the database (None if it already exists)."""
+        try:
+            row = self._fetchrow(
+                'INSERT INTO posts (creator_id, tiktok_post_id, post_url, description, hashtags, created_at) '
+                'VALUES ($1, $2, $3, $4, $5, $6) '
+                'ON CONFLICT (tiktok_post_id) DO NOTHING RETURNING *',
+                creator_id, tiktok_post_id, post_url, description, hashtags or [],
+                _to_db_value('created_at', created_at)
+            )
+            if row:
+                logger.info(f"Added post: {tiktok_post_id}")
+            return row
+        except Exception as e:
+            logger.error(f"Error adding post {tiktok_post_id}: {e}")
+            return None
+    
+    def add_posts(self, posts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Add many posts with COPY, skipping posts that already exist."""
+        if not posts:
+            return []
+        
+        records = [
+            (
+                post['creator_id'],
+                post['tiktok_post_id'],
+                post['post_url'],
+                post.get('description'),
+                post.get('hashtags') or [],
+                _to_db_value('created_at', post.get('created_at'))
+            )
+            for post in posts
+        ]
+        
+        try:
+            rows = self._run(self._copy_posts(records))
+            logger.info(f"Added {len(rows)} of {len(posts)} posts")
+            return rows
+        except Exception as e:
+            logger.error(f"Error adding {len(posts)} posts: {e}")
+            return []
+    
+    async def _copy_posts(self, records: List[tuple]) -> List[Dict[str, Any]]:
+        """COPY posts into a staging table, then insert the new ones."""
+        columns = ', '.join(POST_COLUMNS)
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(
+                    'CREATE TEMP TABLE IF NOT EXISTS posts_staging '
+                    '(LIKE posts INCLUDING DEFAULTS) ON COMMIT DELETE ROWS'
+                )
+                await conn.copy_records_to_table('posts_staging', records=records, columns=POST_COLUMNS)
+                inserted = await conn.fetch(
+                    f'INSERT INTO posts ({columns}) SELECT {columns} FROM posts_staging '
+                    f'ON CONFLICT (tiktok_post_id) DO NOTHING RETURNING *'
+                )
+        return [_record_to_dict(record) for record in inserted]
+    
+    def post_exists(self, tiktok_post_id: str) -> bool:
+        """Check if a post already exists in the database."""
+        try:
+            return bool(self._run(self.pool.fetchval(
+                'SELECT EXISTS (SELECT 1 FROM posts WHERE tiktok_post_id = $1)', tiktok_post_id
+            )))
+        except Exception as e:
+            logger.error(f"Error checking post existence {tiktok_post_id}: {e}")
+            return False
+    
+    def get_creator_posts(self, creator_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get recent posts for a creator."""
+        try:
+            return self._fetch(
+                'SELECT * FROM posts WHERE creator_id = $1 ORDER BY created_at DESC LIMIT $2',
+                creator_id, limit
+            )
+        except Exception as e:
+            logger.error(f"Error fetching posts for creator {creator_id}: {e}")
+            return []
+    
+    def search_posts(
+        self,
+        telegram_user_id: int,
+        query: str,
+        limit: int = 5,
+        after: Optional[Tuple[float, str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Full-text search the posts of a user's tracked creators."""
+        try:
+            return self._fetch(
+                'SELECT * FROM search_posts($1, $2, $3, $4, $5)',
+                query, telegram_user_id, limit,
+                after[0] if after else None, after[1] if after else None
+            )
+        except Exception as e:
+            logger.error(f"Error searching posts for user {telegram_user_id}: {e}")
+            return []
+    
+    # ==================== State ====================
+    
+    def get_state(self, key: str) -> Optional[Any]:
+        """Get a JSON value stored under a key."""
+        try:
+            row = self._fetchrow('SELECT value FROM app_state WHERE key = $1', key)
+            return json.loads(row['value']) if row else None
+        except Exception as e:
+            logger.error(f"Error fetching state {key}: {e}")
+            return None
+    
+    def set_state(self, key: str, value: Any) -> bool:
+        """Store a JSON value under a key."""
+        try:
+            self._run(self.pool.execute(
+                'INSERT INTO app_state (key, value, updated_at) VALUES ($1, $2::jsonb, NOW()) '
+                'ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value, updated_at = EXCLUDED.updated_at',
+                key, json.dumps(value)
+            ))
+            return True
+        except Exception as e:
+            logger.error(f"Error saving state {key}: {e}")
+            return False
+    
+    # ==================== Sync ====================
+    
+    def ping(self):
+        """Check that the database is reachable."""
+        self._run(self.pool.fetchval('SELECT 1'))
+    
+    def upsert_rows(self, table: str, rows: List[Dict[str, Any]]):
+        """Upsert full rows into a table (posts are never overwritten)."""
+        if not rows:
+            return
+        
+        key = PRIMARY_KEYS[table]
+        columns = list(rows[0].keys())
+        placeholders = ', '.join(f'${i}' for i in range(1, len(columns) + 1))
+        
+        if table == 'posts':
+            conflict = 'DO NOTHING'
+        else:
+            updates = ', '.join(f'{column} = EXCLUDED.{column}' for column in columns if column != key)
+            conflict = f'DO UPDATE SET {updates}'
+        
+        query = (
+            f'INSERT INTO {table} ({", ".join(columns)}) VALUES ({placeholders}) '
+            f'ON CONFLICT ({key}) {conflict}'
+        )
+        args = [
+            tuple(_to_db_value(column, row.get(column)) for column in columns)
+            for row in rows
+        ]
+        self._run(self.pool.executemany(query, args))
+    
+    def fetch_mirror_rows(self, posts_per_creator: int) -> Dict[str, List[Dict[str, Any]]]:
+        """Fetch creators, active creators' recent posts and active bot users (raises on error)."""
+        creators = self._fetch('SELECT * FROM tracked_creators ORDER BY created_at')
+        bot_users = self._fetch('SELECT * FROM bot_users WHERE is_active = TRUE')
+        posts = self._fetch(
+            'SELECT p.* FROM tracked_creators c '
+            'CROSS JOIN LATERAL ('
+            f'    SELECT {MIRROR_POST_COLUMNS} FROM posts WHERE creator_id = c.id ORDER BY created_at DESC LIMIT $1'
+            ') p '
+            'WHERE c.is_active = TRUE',
+            posts_per_creator
+        )
+        return {'tracked_creators': creators, 'posts': posts, 'bot_users': bot_users}
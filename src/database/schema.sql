@@ -15,6 +15,7 @@ CREATE TABLE IF NOT EXISTS tracked_creators (
 -- Index for faster lookups
 CREATE INDEX IF NOT EXISTS idx_tracked_creators_username ON tracked_creators(tiktok_username);
 CREATE INDEX IF NOT EXISTS idx_tracked_creators_active ON tracked_creators(is_active) WHERE is_active = TRUE;
+CREATE INDEX IF NOT EXISTS idx_tracked_creators_added_by ON tracked_creators(added_by_telegram_user);
 
 -- Table: posts
 -- Stores historical posts to prevent duplicate alerts
@@ -34,6 +35,22 @@ CREATE INDEX IF NOT EXISTS idx_posts_creator_id ON posts(creator_id);
 CREATE INDEX IF NOT EXISTS idx_posts_tiktok_post_id ON posts(tiktok_post_id);
 CREATE INDEX IF NOT EXISTS idx_posts_scraped_at ON posts(scraped_at DESC);
 
+-- Full-text search over hashtags (weight A) and description (weight B).
+-- The 'simple' configuration does no stemming, which suits mixed-language posts.
+-- array_to_string is not immutable, so generated columns need this wrapper.
+CREATE OR REPLACE FUNCTION immutable_array_to_string(TEXT[])
+RETURNS TEXT
+LANGUAGE sql IMMUTABLE PARALLEL SAFE
+AS $$ SELECT array_to_string($1, ' ') $$;
+
+ALTER TABLE posts ADD COLUMN IF NOT EXISTS search_vector TSVECTOR
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(immutable_array_to_string(hashtags), '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_posts_search_vector ON posts USING GIN (search_vector);
+
 -- Table: bot_users
 -- Stores Telegram users subscribed to alerts
 CREATE TABLE IF NOT EXISTS bot_users (
@@ -41,12 +58,109 @@ CREATE TABLE IF NOT EXISTS bot_users (
     username TEXT,
     first_name TEXT,
     subscribed_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-    is_active BOOLEAN DEFAULT TRUE
+    is_active BOOLEAN DEFAULT TRUE,
+    alert_mode TEXT NOT NULL DEFAULT 'immediate' CHECK (alert_mode IN ('immediate', 'digest'))
 );
 
+-- Alert delivery mode for databases created before it was added
+ALTER TABLE bot_users ADD COLUMN IF NOT EXISTS alert_mode TEXT NOT NULL DEFAULT 'immediate'
+    CHECK (alert_mode IN ('immediate', 'digest'));
+
 -- Index for active users
 CREATE INDEX IF NOT EXISTS idx_bot_users_active ON bot_users(is_active) WHERE is_active = TRUE;
 
+-- Table: creator_health
+-- Circuit breaker state of creators whose scrapes keep failing
+CREATE TABLE IF NOT EXISTS creator_health (
+    tiktok_username TEXT PRIMARY KEY,
+    state TEXT NOT NULL DEFAULT 'closed' CHECK (state IN ('closed', 'open', 'half_open')),
+    failure_count INTEGER NOT NULL DEFAULT 0,
+    trip_count INTEGER NOT NULL DEFAULT 0,
+    open_until TIMESTAMP WITH TIME ZONE,
+    last_error TEXT,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Table: app_state
+-- Small JSON documents saved by the bot (e.g. scheduler state for warm restarts)
+CREATE TABLE IF NOT EXISTS app_state (
+    key TEXT PRIMARY KEY,
+    value JSONB NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Function: search_posts
+-- Ranked full-text search limited to the creators a user tracks.
+-- The user's creators are resolved first so only their posts are matched.
+-- Ranking is capped to the newest max_candidates matches so very common
+-- terms stay fast: older matches of a broad query are not ranked, and
+-- every row then has capped = TRUE so the bot can say so. Pages are
+-- keyset: pass the rank and tiktok_post_id of the previous page's last
+-- row as after_rank / after_post_id.
+DROP FUNCTION IF EXISTS search_posts(TEXT, BIGINT, INTEGER, INTEGER);
+DROP FUNCTION IF EXISTS search_posts(TEXT, BIGINT, INTEGER, REAL, TEXT, INTEGER);
+CREATE OR REPLACE FUNCTION search_posts(
+    search_query TEXT,
+    search_user_id BIGINT,
+    result_limit INTEGER DEFAULT 5,
+    after_rank REAL DEFAULT NULL,
+    after_post_id TEXT DEFAULT NULL,
+    max_candidates INTEGER DEFAULT 1000
+)
+RETURNS TABLE (
+    tiktok_post_id TEXT,
+    post_url TEXT,
+    description TEXT,
+    hashtags TEXT[],
+    created_at TIMESTAMP WITH TIME ZONE,
+    tiktok_username TEXT,
+    rank REAL,
+    capped BOOLEAN
+)
+LANGUAGE sql STABLE
+AS $$
+    WITH user_creators AS (
+        SELECT id, tiktok_username
+        FROM tracked_creators
+        WHERE added_by_telegram_user = search_user_id
+          AND is_active = TRUE
+    ),
+    matches AS (
+        -- Only keys go through the scan and sort; one extra row tells
+        -- whether there are more matches than the cap
+        SELECT p.id, p.created_at
+        FROM websearch_to_tsquery('simple', search_query) AS q(query)
+        JOIN posts p ON p.search_vector @@ q.query
+        WHERE p.creator_id = ANY(ARRAY(SELECT id FROM user_creators))
+        ORDER BY p.created_at DESC NULLS LAST, p.id DESC
+        LIMIT max_candidates + 1
+    ),
+    candidates AS (
+        SELECT m.id, row_number() OVER (ORDER BY m.created_at DESC NULLS LAST, m.id DESC) AS recency
+        FROM matches m
+    ),
+    ranked AS MATERIALIZED (
+        SELECT p.*, ts_rank(p.search_vector, websearch_to_tsquery('simple', search_query)) AS rank
+        FROM candidates c
+        JOIN posts p ON p.id = c.id
+        WHERE c.recency <= max_candidates
+    )
+    SELECT
+        r.tiktok_post_id,
+        r.post_url,
+        r.description,
+        r.hashtags,
+        r.created_at,
+        uc.tiktok_username,
+        r.rank,
+        (SELECT count(*) FROM matches) > max_candidates AS capped
+    FROM ranked r
+    JOIN user_creators uc ON uc.id = r.creator_id
+    WHERE after_rank IS NULL OR (r.rank, r.tiktok_post_id) < (after_rank, after_post_id)
+    ORDER BY r.rank DESC, r.tiktok_post_id DESC
+    LIMIT result_limit;
+$$;
+
 -- View: creator_stats
 -- Helpful view for monitoring
 CREATE OR REPLACE VIEW creator_stats AS
@@ -1,15 +1,22 @@
 """Supabase database client wrapper."""
 import logging
-from typing import List, Dict, Optional, Any
-from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from datetime import datetime, timezone
 from supabase import create_client, Client
 from config.settings import settings
+from src.database.base import StorageBackend
 
 logger = logging.getLogger(__name__)
 
+# Rows per request when reading whole tables (PostgREST caps responses)
+MIRROR_PAGE_SIZE = 1000
 
-class SupabaseClient:
-    """Wrapper for Supabase database operations."""
+# Post columns kept by the local store (leaves out the search vector)
+MIRROR_POST_COLUMNS = 'id, creator_id, tiktok_post_id, post_url, description, hashtags, created_at, scraped_at'
+
+
+class SupabaseClient(StorageBackend):
+    """Wrapper for Supabase database operations (PostgREST)."""
     
     def __init__(self):
         """Initialize Supabase client."""
@@ -43,6 +50,34 @@ class SupabaseClient:
             logger.error(f"Error adding/updating bot user {telegram_user_id}: {e}")
             raise
     
+    def get_bot_user(self, telegram_user_id: int) -> Optional[Dict[str, Any]]:
+        """Get a bot user by Telegram user ID."""
+        try:
+            result = self.client.table('bot_users')\
+                .select('*')\
+                .eq('telegram_user_id', telegram_user_id)\
+                .execute()
+            return result.data[0] if result.data else None
+        except Exception as e:
+            logger.error(f"Error fetching bot user {telegram_user_id}: {e}")
+            return None
+    
+    def set_alert_mode(self, telegram_user_id: int, alert_mode: str) -> bool:
+        """Set how a bot user receives alerts ('immediate' or 'digest')."""
+        try:
+            result = self.client.table('bot_users')\
+                .update({'alert_mode': alert_mode})\
+                .eq('telegram_user_id', telegram_user_id)\
+                .execute()
+            
+            if result.data:
+                logger.info(f"Set alert mode for bot user {telegram_user_id}: {alert_mode}")
+                return True
+            return False
+        except Exception as e:
+            logger.error(f"Error setting alert mode for bot user {telegram_user_id}: {e}")
+            return False
+    
     def get_active_bot_users(self) -> List[Dict[str, Any]]:
         """Get all active bot users."""
         try:
@@ -72,13 +107,75 @@ class SupabaseClient:
                 'is_active': True
             }
             
-            result = self.client.table('tracked_creators').insert(data).execute()
-            logger.info(f"Added tracked creator: {tiktok_username}")
-            return result.data[0] if result.data else None
+            rows = self._insert_creators([data])
+            if rows:
+                logger.info(f"Added tracked creator: {tiktok_username}")
+            return rows[0] if rows else None
         except Exception as e:
             logger.error(f"Error adding tracked creator {tiktok_username}: {e}")
             return None
     
+    def add_tracked_creators(
+        self,
+        tiktok_usernames: List[str],
+        telegram_user_id: int
+    ) -> List[Dict[str, Any]]:
+        """Add many TikTok creators, skipping usernames that are already tracked."""
+        if not tiktok_usernames:
+            return []
+        
+        try:
+            data = [
+                {
+                    'tiktok_username': tiktok_username.lower(),
+                    'added_by_telegram_user': telegram_user_id,
+                    'is_active': True
+                }
+                for tiktok_username in tiktok_usernames
+            ]
+            
+            rows = self._insert_creators(data)
+            logger.info(f"Added {len(rows)} of {len(data)} tracked creators")
+            return rows
+        except Exception as e:
+            logger.error(f"Error adding {len(tiktok_usernames)} tracked creators: {e}")
+            return []
+    
+    def _insert_creators(self, data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Insert creators, re-activating removed ones and skipping active ones.
+
+        Returns:
+            Rows of the creators that were inserted or re-activated
+        """
+        usernames = [row['tiktok_username'] for row in data]
+        existing = self.client.table('tracked_creators')\
+            .select('tiktok_username, is_active')\
+            .in_('tiktok_username', usernames)\
+            .execute()
+        active = {row['tiktok_username'] for row in existing.data if row['is_active']}
+        inactive = {row['tiktok_username'] for row in existing.data if not row['is_active']}
+        
+        rows = []
+        for row in data:
+            if row['tiktok_username'] not in inactive:
+                continue
+            # Only take over the row if it is still removed
+            result = self.client.table('tracked_creators')\
+                .update({key: value for key, value in row.items() if value is not None})\
+                .eq('tiktok_username', row['tiktok_username'])\
+                .eq('is_active', False)\
+                .execute()
+            rows.extend(result.data)
+        
+        new = [row for row in data if row['tiktok_username'] not in active | inactive]
+        if new:
+            result = self.client.table('tracked_creators')\
+                .upsert(new, on_conflict='tiktok_username', ignore_duplicates=True)\
+                .execute()
+            rows.extend(result.data)
+        return rows
+    
     def remove_tracked_creator(
         self,
         tiktok_username: str,
@@ -90,6 +187,7 @@ class SupabaseClient:
                 .update({'is_active': False})\
                 .eq('tiktok_username', tiktok_username.lower())\
                 .eq('added_by_telegram_user', telegram_user_id)\
+                .eq('is_active', True)\
                 .execute()
             
             if result.data:
@@ -102,13 +200,16 @@ class SupabaseClient:
     
     def get_tracked_creators(
         self,
-        telegram_user_id: Optional[int] = None
+        telegram_user_id: Optional[int] = None,
+        include_inactive: bool = False
     ) -> List[Dict[str, Any]]:
         """Get tracked creators, optionally filtered by Telegram user."""
         try:
             query = self.client.table('tracked_creators')\
-                .select('*')\
-                .eq('is_active', True)
+                .select('*')
+            
+            if not include_inactive:
+                query = query.eq('is_active', True)
             
             if telegram_user_id:
                 query = query.eq('added_by_telegram_user', telegram_user_id)
@@ -136,6 +237,29 @@ class SupabaseClient:
             logger.error(f"Error fetching creator {tiktok_username}: {e}")
             return None
     
+    # ==================== Creator Health ====================
+    
+    def get_creator_health(self) -> List[Dict[str, Any]]:
+        """Get circuit breaker state of all creators that have failed."""
+        try:
+            result = self.client.table('creator_health')\
+                .select('*')\
+                .execute()
+            return result.data
+        except Exception as e:
+            logger.error(f"Error fetching creator health: {e}")
+            return []
+    
+    def upsert_creator_health(self, health: Dict[str, Any]) -> bool:
+        """Save circuit breaker state of a creator."""
+        try:
+            data = dict(health, updated_at=datetime.now(timezone.utc).isoformat())
+            self.client.table('creator_health').upsert(data).execute()
+            return True
+        except Exception as e:
+            logger.error(f"Error saving health of creator {health.get('tiktok_username')}: {e}")
+            return False
+    
     # ==================== Posts ====================
     
     def add_post(
@@ -166,6 +290,33 @@ class SupabaseClient:
             logger.debug(f"Post {tiktok_post_id} might already exist: {e}")
             return None
     
+    def add_posts(self, posts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Add many posts in one request, skipping posts that already exist."""
+        if not posts:
+            return []
+        
+        try:
+            data = [
+                {
+                    'creator_id': post['creator_id'],
+                    'tiktok_post_id': post['tiktok_post_id'],
+                    'post_url': post['post_url'],
+                    'description': post.get('description'),
+                    'hashtags': post.get('hashtags') or [],
+                    'created_at': post['created_at'].isoformat() if post.get('created_at') else None
+                }
+                for post in posts
+            ]
+            
+            result = self.client.table('posts')\
+                .upsert(data, on_conflict='tiktok_post_id', ignore_duplicates=True)\
+                .execute()
+            logger.info(f"Added {len(result.data)} of {len(posts)} posts")
+            return result.data
+        except Exception as e:
+            logger.error(f"Error adding {len(posts)} posts: {e}")
+            return []
+    
     def post_exists(self, tiktok_post_id: str) -> bool:
         """Check if a post already exists in the database."""
         try:
@@ -197,3 +348,117 @@ class SupabaseClient:
         except Exception as e:
             logger.error(f"Error fetching posts for creator {creator_id}: {e}")
             return []
+    
+    def search_posts(
+        self,
+        telegram_user_id: int,
+        query: str,
+        limit: int = 5,
+        after: Optional[Tuple[float, str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Full-text search the posts of a user's tracked creators (search_posts RPC)."""
+        try:
+            result = self.client.rpc('search_posts', {
+                'search_query': query,
+                'search_user_id': telegram_user_id,
+                'result_limit': limit,
+                'after_rank': after[0] if after else None,
+                'after_post_id': after[1] if after else None
+            }).execute()
+            return result.data or []
+        except Exception as e:
+            logger.error(f"Error searching posts for user {telegram_user_id}: {e}")
+            return []
+    
+    # ==================== State ====================
+    
+    def get_state(self, key: str) -> Optional[Any]:
+        """Get a JSON value stored under a key."""
+        try:
+            result = self.client.table('app_state')\
+                .select('value')\
+                .eq('key', key)\
+                .execute()
+            return result.data[0]['value'] if result.data else None
+        except Exception as e:
+            logger.error(f"Error fetching state {key}: {e}")
+            return None
+    
+    def set_state(self, key: str, value: Any) -> bool:
+        """Store a JSON value under a key."""
+        try:
+            self.client.table('app_state').upsert({
+                'key': key,
+                'value': value,
+                'updated_at': datetime.now(timezone.utc).isoformat()
+            }).execute()
+            return True
+        except Exception as e:
+            logger.error(f"Error saving state {key}: {e}")
+            return False
+    
+    # ==================== Sync ====================
+    
+    def ping(self):
+        """
+        Check that the database is reachable.
+        
+        Raises:
+            Exception: If the database could not be queried
+        """
+        self.client.table('bot_users').select('telegram_user_id').limit(1).execute()
+    
+    def upsert_rows(self, table: str, rows: List[Dict[str, Any]]):
+        """
+        Upsert full rows into a table (used to sync the local store).
+        
+        Posts are immutable, so existing posts are left untouched; other
+        tables are updated by primary key.
+        
+        Raises:
+            Exception: If the rows could not be written
+        """
+        if table == 'posts':
+            self.client.table(table)\
+                .upsert(rows, on_conflict='tiktok_post_id', ignore_duplicates=True)\
+                .execute()
+        else:
+            self.client.table(table).upsert(rows).execute()
+
+    def _fetch_all(self, make_query: Callable[[], Any]) -> List[Dict[str, Any]]:
+        """Fetch every row of a query, page by page (PostgREST caps result size)."""
+        rows: List[Dict[str, Any]] = []
+        while True:
+            # Builders keep their filters, so every page needs a fresh one
+            page = make_query().range(len(rows), len(rows) + MIRROR_PAGE_SIZE - 1).execute().data
+            rows.extend(page)
+            if len(page) < MIRROR_PAGE_SIZE:
+                return rows
+    
+    def fetch_mirror_rows(self, posts_per_creator: int) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Fetch every tracked creator, the active creators' recent posts and
+        the active bot users (used to fill the local store).
+
+        Raises:
+            Exception: If any of the rows could not be fetched
+        """
+        creators = self._fetch_all(
+            lambda: self.client.table('tracked_creators').select('*').order('created_at')
+        )
+        bot_users = self._fetch_all(
+            lambda: self.client.table('bot_users').select('*').eq('is_active', True).order('telegram_user_id')
+        )
+        
+        posts = []
+        for creator in creators:
+            if creator.get('is_active', True):
+                result = self.client.table('posts')\
+                    .select(MIRROR_POST_COLUMNS)\
+                    .eq('creator_id', creator['id'])\
+                    .order('created_at', desc=True)\
+                    .limit(posts_per_creator)\
+                    .execute()
+                posts.extend(result.data)
+        
+        return {'tracked_creators': creators, 'posts': posts, 'bot_users': bot_users}
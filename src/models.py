@@ -0,0 +1,63 @@
+"""Typed records passed through the monitoring pipeline."""
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+@dataclass(slots=True)
+class Post:
+    """A TikTok post as scraped, stored and alerted."""
+    
+    id: str
+    url: str
+    author: str
+    description: str = ''
+    hashtags: List[str] = field(default_factory=list)
+    created_at: Optional[datetime] = None
+    
+    def to_row(self, creator_id: str) -> Dict[str, Any]:
+        """Convert to ``add_post``/``add_posts`` arguments."""
+        return {
+            'creator_id': creator_id,
+            'tiktok_post_id': self.id,
+            'post_url': self.url,
+            'description': self.description,
+            'hashtags': self.hashtags,
+            'created_at': self.created_at,
+        }
+    
+    @classmethod
+    def from_row(cls, row: Dict[str, Any], author: str) -> 'Post':
+        """Create from a ``posts`` database row."""
+        created_at = row.get('created_at')
+        if isinstance(created_at, str):
+            created_at = datetime.fromisoformat(created_at)
+        
+        return cls(
+            id=row['tiktok_post_id'],
+            url=row['post_url'],
+            author=author,
+            description=row.get('description') or '',
+            hashtags=row.get('hashtags') or [],
+            created_at=created_at,
+        )
+
+
+@dataclass(slots=True)
+class Creator:
+    """A tracked TikTok creator."""
+    
+    id: str
+    tiktok_username: str
+    added_by_telegram_user: Optional[int] = None
+    is_active: bool = True
+    
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> 'Creator':
+        """Create from a ``tracked_creators`` database row."""
+        return cls(
+            id=str(row['id']),
+            tiktok_username=row['tiktok_username'],
+            added_by_telegram_user=row.get('added_by_telegram_user'),
+            is_active=bool(row.get('is_active', True)),
+        )
@@ -0,0 +1,122 @@
+"""Fair sharing of the scrape budget between bot users."""
+import heapq
+import itertools
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from src.models import Creator
+
+
+class FairShareScheduler:
+    """
+    Divide the scrape budget of each interval between users.
+
+    Due creators are ordered by fair queuing on the user who added them:
+    every scrape advances its user's virtual finish time by one, and the
+    creator whose user has the smallest finish time goes next. A user with many creators therefore cannot push a light
+    user's creators to the back of the cycle, and when the budget runs out
+    it is the heavy users' creators that wait for the next window.
+    """
+    
+    def __init__(
+        self,
+        budget_per_interval: int,
+        interval_seconds: float
+    ):
+        """
+        Initialize scheduler.
+
+        Args:
+            budget_per_interval: Max scrapes per interval (0 = unlimited)
+            interval_seconds: Length of a budget window
+        """
+        self.budget = budget_per_interval
+        self.interval = interval_seconds
+        self.virtual_time = 0.0
+        self.finish_tags: Dict[Optional[int], float] = {}
+        self.window_start = time.monotonic()
+        self.used: Dict[Optional[int], int] = {}
+    
+    def _roll_window(self):
+        """Start a new budget window once the interval has elapsed."""
+        now = time.monotonic()
+        if now - self.window_start >= self.interval:
+            self.window_start = now
+            self.used = {}
+    
+    def remaining(self) -> Optional[int]:
+        """Scrapes left in the current window (None = unlimited)."""
+        self._roll_window()
+        if self.budget <= 0:
+            return None
+        return max(self.budget - sum(self.used.values()), 0)
+    
+    def pick(self, creators: List[Creator]) -> List[Creator]:
+        """
+        Order due creators fairly and cut the list to the remaining budget.
+
+        Args:
+            creators: Due creators, most overdue first
+
+        Returns:
+            Creators to check now, in the order they should be scraped
+        """
+        limit = self.remaining()
+        if limit is None:
+            limit = len(creators)
+        
+        queues: Dict[Optional[int], Deque[Creator]] = {}
+        for creator in creators:
+            queues.setdefault(creator.added_by_telegram_user, deque()).append(creator)
+        
+        # Heap entries: (finish tag, start tag, tie breaker, user)
+        counter = itertools.count()
+        heap = []
+        for user in queues:
+            start = max(self.virtual_time, self.finish_tags.get(user, 0.0))
+            heapq.heappush(heap, (start + 1, start, next(counter), user))
+        
+        picked = []
+        while heap and len(picked) < limit:
+            finish, start, _, user = heapq.heappop(heap)
+            picked.append(queues[user].popleft())
+            self.virtual_time = start
+            self.finish_tags[user] = finish
+            
+            if queues[user]:
+                heapq.heappush(heap, (finish + 1, finish, next(counter), user))
+        
+        return picked
+    
+    def charge(self, telegram_user_id: Optional[int]):
+        """Count one scrape against a user's share of the window."""
+        self._roll_window()
+        self.used[telegram_user_id] = self.used.get(telegram_user_id, 0) + 1
+    
+    def get_share(self, telegram_user_id: int) -> Dict[str, Any]:
+        """
+        Report a user's use of the current window.
+
+        Returns:
+            Dictionary with the user's scrapes, all scrapes, the budget and
+            the user's share of the scrapes in percent
+        """
+        self._roll_window()
+        total = sum(self.used.values())
+        used = self.used.get(telegram_user_id, 0)
+        return {
+            'used': used,
+            'total': total,
+            'budget': self.budget or None,
+            'share_percent': round(100 * used / total, 1) if total else 0.0,
+        }
+    
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """Report every user's use of the current window."""
+        self._roll_window()
+        return [
+            dict(self.get_share(user), telegram_user_id=user)
+            for user in sorted(self.used, key=lambda user: -self.used[user])
+            if user is not None
+        ]
@@ -1,22 +1,31 @@
 """Monitoring logic for checking TikTok posts."""
 import logging
-from typing import List, Dict, Any
+from typing import Callable, Dict, List, Optional
+from datetime import datetime, timedelta, timezone
 import asyncio
 
-from src.database.supabase_client import SupabaseClient
-from src.tiktok.scraper import TikTokScraper
+from src.database.base import StorageBackend
+from src.models import Creator, Post
+from src.tiktok.scraper import TikTokScraper, ScrapeError
+from src.tiktok.circuit_breaker import CircuitBreaker
+from src.tiktok.proxy_pool import classify_error
+from src.scheduler.pipeline import MonitorPipeline
+from src.analytics.trending import TrendingHashtags
 from src.bot.telegram_bot import TelegramBot
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Key of the hashtag counts snapshot in the state store
+TRENDING_STATE_KEY = 'trending_hashtags'
+
 
 class Monitor:
     """Monitor TikTok creators for new posts."""
     
     def __init__(
         self,
-        db_client: SupabaseClient,
+        db_client: StorageBackend,
         tiktok_scraper: TikTokScraper,
         telegram_bot: TelegramBot
     ):
@@ -24,120 +33,208 @@ class Monitor:
         self.db = db_client
         self.scraper = tiktok_scraper
         self.bot = telegram_bot
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+            base_backoff_seconds=settings.CIRCUIT_BASE_BACKOFF_MINUTES * 60,
+            max_backoff_seconds=settings.CIRCUIT_MAX_BACKOFF_HOURS * 3600
+        )
+        self.breaker_loaded = False
+        self.trending = TrendingHashtags(capacity=settings.TRENDING_SKETCH_SIZE)
+        self.pipeline = MonitorPipeline(
+            self,
+            fetch_workers=settings.PIPELINE_FETCH_WORKERS,
+            diff_batch_size=settings.PIPELINE_DIFF_BATCH_SIZE,
+            persist_batch_size=settings.PIPELINE_PERSIST_BATCH_SIZE,
+            notify_workers=settings.PIPELINE_NOTIFY_WORKERS,
+            queue_size=settings.PIPELINE_QUEUE_SIZE
+        )
+    
+    async def load_breaker_state(self):
+        """Restore circuit breaker state saved by a previous run."""
+        rows = await asyncio.to_thread(self.db.get_creator_health)
+        self.breaker.load(rows)
+        self.breaker_loaded = True
+    
+    async def load_trending(self):
+        """Restore hashtag counts saved by a previous run."""
+        snapshot = await asyncio.to_thread(self.db.get_state, TRENDING_STATE_KEY)
+        if snapshot:
+            self.trending.restore(snapshot)
+    
+    async def save_trending(self):
+        """Save hashtag counts if they changed since the last save."""
+        if not self.trending.changed:
+            return
+        
+        self.trending.changed = False
+        await asyncio.to_thread(self.db.set_state, TRENDING_STATE_KEY, self.trending.snapshot())
+    
+    async def _record_scrape_failure(self, creator: Creator, error: ScrapeError):
+        """Track a failed scrape and notify the owner if the creator gets suspended."""
+        username = creator.tiktok_username
+        
+        # Throttling, challenge pages and proxy outages hit every creator
+        # alike; only failures of the account itself count toward its circuit
+        if classify_error(str(error)) != 'account':
+            logger.warning(f"Scrape of @{username} failed, not counted against it: {error}")
+            return
+        
+        opened = self.breaker.record_failure(username, str(error))
+        health = self.breaker.get(username)
+        
+        await asyncio.to_thread(self.db.upsert_creator_health, health.to_row())
+        
+        if opened and creator.added_by_telegram_user:
+            await self.bot.send_creator_suspended(
+                creator.added_by_telegram_user,
+                username,
+                retry_at=datetime.fromtimestamp(health.open_until, tz=timezone.utc),
+                reason=health.last_error
+            )
     
-    async def check_creator(self, creator: Dict[str, Any]) -> List[Dict[str, Any]]:
+    async def _record_scrape_success(self, username: str):
+        """Track a successful scrape, closing the creator's circuit."""
+        if self.breaker.record_success(username):
+            health = self.breaker.get(username)
+            await asyncio.to_thread(self.db.upsert_creator_health, health.to_row())
+    
+    @staticmethod
+    def alert_threshold() -> Optional[datetime]:
+        """Oldest post creation time that still gets an alert (None = no limit)."""
+        if not settings.ALERT_ONLY_RECENT_POSTS:
+            return None
+        
+        # Calculate threshold: now - (interval + buffer)
+        # Buffer accounts for scraping delays
+        return datetime.now(timezone.utc) - timedelta(
+            minutes=settings.MONITOR_INTERVAL_MINUTES * 2
+        )
+    
+    @staticmethod
+    def is_recent(post: Post, threshold: Optional[datetime]) -> bool:
+        """Check whether a post is new enough to alert about."""
+        if threshold is None or post.created_at is None:
+            return True
+        
+        post_time = post.created_at
+        
+        # If post doesn't have timezone, assume UTC
+        if post_time.tzinfo is None:
+            post_time = post_time.replace(tzinfo=timezone.utc)
+        
+        if post_time < threshold:
+            logger.info(
+                f"Skipping alert for old post {post.id} "
+                f"from @{post.author} (created: {post_time}, "
+                f"threshold: {threshold})"
+            )
+            return False
+        
+        return True
+    
+    async def seed_creator(self, creator: Creator) -> Optional[int]:
         """
-        Check a single creator for new posts.
+        First check of a newly added creator.
+        
+        Confirms the account can be fetched and stores its current posts
+        without alerting, so the next cycle only reports posts published
+        after the creator was added. The result is sent to the user who
+        added the creator.
         
         Args:
-            creator: Creator information from database
+            creator: Newly added creator
             
         Returns:
-            List of new posts found
+            Number of posts stored, or None if the account could not be fetched
         """
-        username = creator['tiktok_username']
-        creator_id = creator['id']
+        username = creator.tiktok_username
         
         try:
-            # Get existing posts for this creator
-            # Use larger limit (50) to avoid missing old posts and sending duplicates
-            existing_posts = self.db.get_creator_posts(
-                creator_id=creator_id,
-                limit=50  # Increased from 5 to properly detect duplicates
-            )
-            existing_post_ids = [post['tiktok_post_id'] for post in existing_posts]
-            
-            # Check for new posts
-            new_posts = await self.scraper.check_new_posts(
-                username=username,
-                existing_post_ids=existing_post_ids,
-                count=settings.MAX_POSTS_PER_CHECK
-            )
+            try:
+                posts = await self.scraper.get_user_videos(username, settings.MAX_POSTS_PER_CHECK)
+            except ScrapeError as e:
+                await self._record_scrape_failure(creator, e)
+                if creator.added_by_telegram_user:
+                    await self.bot.send_creator_not_found(
+                        creator.added_by_telegram_user, username, reason=str(e)
+                    )
+                return None
             
-            if not new_posts:
-                logger.debug(f"No new posts for @{username}")
-                return []
+            await self._record_scrape_success(username)
             
-            # Store new posts and send alerts
-            successfully_added = []
-            for post in new_posts:
-                # Add post to database
-                result = self.db.add_post(
-                    creator_id=creator_id,
-                    tiktok_post_id=post['id'],
-                    post_url=post['url'],
-                    description=post.get('description'),
-                    hashtags=post.get('hashtags', []),
-                    created_at=post.get('created_at')
+            inserted = []
+            if posts:
+                inserted = await asyncio.to_thread(
+                    self.db.add_posts,
+                    [post.to_row(creator.id) for post in posts]
                 )
-                
-                # Only send alert if post was successfully added (not duplicate)
-                if result:
-                    # Check if we should alert based on post age
-                    should_alert = True
-                    
-                    if settings.ALERT_ONLY_RECENT_POSTS and post.get('created_at'):
-                        from datetime import datetime, timedelta, timezone
-                        
-                        # Calculate threshold: now - (interval + buffer)
-                        # Buffer accounts for scraping delays
-                        threshold = datetime.now(timezone.utc) - timedelta(
-                            minutes=settings.MONITOR_INTERVAL_MINUTES * 2
-                        )
-                        
-                        post_time = post['created_at']
-                        
-                        # If post doesn't have timezone, assume UTC
-                        if post_time.tzinfo is None:
-                            post_time = post_time.replace(tzinfo=timezone.utc)
-                        
-                        if post_time < threshold:
-                            should_alert = False
-                            logger.info(
-                                f"Skipping alert for old post {post['id']} "
-                                f"from @{username} (created: {post_time}, "
-                                f"threshold: {threshold})"
-                            )
-                    
-                    if should_alert:
-                        await self.bot.send_alerts_to_all_users(post, username)
-                        successfully_added.append(post)
-                    else:
-                        # Still add to successfully_added for accurate count
-                        successfully_added.append(post)
-                else:
-                    logger.warning(f"Skipped duplicate post {post['id']} for @{username}")
-
             
-            logger.info(f"Processed {len(successfully_added)} new posts for @{username}")
-            return successfully_added
+            logger.info(f"Seeded @{username} with {len(inserted)} existing posts")
+            
+            if creator.added_by_telegram_user:
+                await self.bot.send_creator_seeded(
+                    creator.added_by_telegram_user, username, len(posts)
+                )
+            return len(inserted)
             
         except Exception as e:
-            logger.error(f"Error checking creator @{username}: {e}")
-            return []
+            logger.error(f"Error seeding creator @{username}: {e}")
+            return None
     
-    async def check_all_creators(self):
-        """Check all tracked creators for new posts."""
+    async def end_cycle(self):
+        """Send the cycle's digests and log scraper statistics (once per interval)."""
+        if settings.ALERT_DIGEST_WINDOW_SECONDS == 0:
+            await self.bot.flush_digests(force=True)
+        
+        for proxy_stats in self.scraper.get_proxy_stats():
+            logger.info(f"Proxy stats: {proxy_stats}")
+    
+    async def check_all_creators(
+        self,
+        select: Optional[Callable[[List[Creator]], List[Creator]]] = None
+    ) -> Dict[str, Optional[int]]:
+        """
+        Check tracked creators for new posts.
+        
+        Args:
+            select: Picks which creators to check, in order (default: all)
+            
+        Returns:
+            Number of new posts per checked username (None if the fetch failed)
+        """
         try:
             # Get all tracked creators
-            creators = self.db.get_tracked_creators()
+            rows = await asyncio.to_thread(self.db.get_tracked_creators)
+            creators = [Creator.from_row(row) for row in rows]
             
             if not creators:
-                logger.info("No creators to monitor")
-                return
+                logger.debug("No creators to monitor")
+                return {}
+            
+            if select is not None:
+                creators = select(creators)
+                if not creators:
+                    return {}
             
             logger.info(f"Checking {len(creators)} creators for new posts...")
             
-            # Check each creator
-            total_new_posts = 0
+            if not self.breaker_loaded:
+                await self.load_breaker_state()
+            
+            # Skip creators whose circuit is open (failing accounts)
+            due = []
             for creator in creators:
-                new_posts = await self.check_creator(creator)
-                total_new_posts += len(new_posts)
-                
-                # Small delay between creators to avoid rate limiting
-                await asyncio.sleep(2)
+                if self.breaker.allow(creator.tiktok_username):
+                    due.append(creator)
+                else:
+                    logger.debug(f"Skipping suspended creator @{creator.tiktok_username}")
+            
+            results = await self.pipeline.run(due)
+            total_new_posts = sum(count for count in results.values() if count)
             
-            logger.info(f"Monitoring cycle complete. Found {total_new_posts} new posts total.")
+            logger.info(f"Checked {len(results)} creators, found {total_new_posts} new posts")
+            return results
             
         except Exception as e:
             logger.error(f"Error in monitoring cycle: {e}")
+            return {}
@@ -0,0 +1,226 @@
+"""Staged monitoring pipeline: fetch → diff → persist → notify."""
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+
+from config.settings import settings
+from src.models import Creator, Post
+from src.tiktok.scraper import ScrapeError
+
+if TYPE_CHECKING:
+    from src.scheduler.monitor import Monitor
+
+logger = logging.getLogger(__name__)
+
+
+async def get_batch(queue: asyncio.Queue, max_size: int) -> list:
+    """Wait for one item, then take whatever else is queued, up to ``max_size``."""
+    batch = [await queue.get()]
+    while len(batch) < max_size:
+        try:
+            batch.append(queue.get_nowait())
+        except asyncio.QueueEmpty:
+            break
+    return batch
+
+
+class MonitorPipeline:
+    """
+    Check creators through stages connected by bounded queues.
+
+    - fetch: scrape each creator (``fetch_workers`` in parallel)
+    - diff: drop posts that are already stored (up to ``diff_batch_size``
+      creators per database round trip)
+    - persist: store new posts of several creators with one ``add_posts``
+      call (up to ``persist_batch_size`` creators per call)
+    - notify: send alerts (``notify_workers`` in parallel; each creator's
+      alerts go through the same worker, so they are sent in order)
+
+    Every queue holds at most ``queue_size`` items, so a saturated stage
+    blocks the stage before it instead of letting work pile up in memory.
+    """
+    
+    def __init__(
+        self,
+        monitor: 'Monitor',
+        fetch_workers: int = 1,
+        diff_batch_size: int = 10,
+        persist_batch_size: int = 10,
+        notify_workers: int = 4,
+        queue_size: int = 20
+    ):
+        """Initialize pipeline around a monitor's scraper, database and bot."""
+        self.monitor = monitor
+        self.fetch_workers = max(1, fetch_workers)
+        self.diff_batch_size = max(1, diff_batch_size)
+        self.persist_batch_size = max(1, persist_batch_size)
+        self.notify_workers = max(1, notify_workers)
+        self.queue_size = max(1, queue_size)
+    
+    async def run(self, creators: List[Creator]) -> Dict[str, Optional[int]]:
+        """
+        Check creators and wait until every stage is drained.
+
+        Args:
+            creators: Creators to check
+
+        Returns:
+            Number of new posts stored per username (None if the fetch failed)
+        """
+        fetch_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        diff_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        persist_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        notify_queues: List[asyncio.Queue] = [
+            asyncio.Queue(self.queue_size) for _ in range(self.notify_workers)
+        ]
+        results: Dict[str, Optional[int]] = {}
+        
+        workers = [
+            asyncio.create_task(self._fetch_worker(fetch_queue, diff_queue, results))
+            for _ in range(self.fetch_workers)
+        ]
+        workers.append(asyncio.create_task(self._diff_worker(diff_queue, persist_queue)))
+        workers.append(asyncio.create_task(
+            self._persist_worker(persist_queue, notify_queues, results)
+        ))
+        workers.extend(
+            asyncio.create_task(self._notify_worker(notify_queue))
+            for notify_queue in notify_queues
+        )
+        
+        try:
+            for creator in creators:
+                await fetch_queue.put(creator)
+            
+            # Each stage puts its output downstream before marking its input
+            # done, so joining the queues in order drains the whole pipeline
+            for queue in (fetch_queue, diff_queue, persist_queue, *notify_queues):
+                await queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        
+        return results
+    
+    async def _fetch_worker(
+        self,
+        inbox: asyncio.Queue,
+        outbox: asyncio.Queue,
+        results: Dict[str, Optional[int]]
+    ):
+        """Scrape creators' recent posts."""
+        monitor = self.monitor
+        
+        while True:
+            creator: Creator = await inbox.get()
+            try:
+                try:
+                    posts = await monitor.scraper.get_user_videos(
+                        creator.tiktok_username,
+                        settings.MAX_POSTS_PER_CHECK
+                    )
+                except ScrapeError as e:
+                    results[creator.tiktok_username] = None
+                    await monitor._record_scrape_failure(creator, e)
+                else:
+                    results[creator.tiktok_username] = 0
+                    await monitor._record_scrape_success(creator.tiktok_username)
+                    if posts:
+                        await outbox.put((creator, posts))
+            except Exception as e:
+                logger.error(f"Error fetching @{creator.tiktok_username}: {e}")
+            finally:
+                inbox.task_done()
+            
+            # Pause between fetches, per fetch worker, to avoid rate limiting
+            await asyncio.sleep(settings.TIKTOK_REQUEST_DELAY)
+    
+    def _load_existing_ids(self, creator_ids: List[str]) -> Dict[str, Set[str]]:
+        """Load stored post IDs of several creators (runs in a thread)."""
+        existing = {}
+        for creator_id in creator_ids:
+            # Use larger limit (50) to avoid missing old posts and sending duplicates
+            posts = self.monitor.db.get_creator_posts(creator_id=creator_id, limit=50)
+            existing[creator_id] = {post['tiktok_post_id'] for post in posts}
+        return existing
+    
+    async def _diff_worker(self, inbox: asyncio.Queue, outbox: asyncio.Queue):
+        """Keep only posts that are not stored yet."""
+        while True:
+            batch: List[Tuple[Creator, List[Post]]] = await get_batch(inbox, self.diff_batch_size)
+            try:
+                existing = await asyncio.to_thread(
+                    self._load_existing_ids,
+                    list({creator.id for creator, _ in batch})
+                )
+                
+                for creator, posts in batch:
+                    seen = existing.get(creator.id, set())
+                    new_posts = [post for post in posts if post.id and post.id not in seen]
+                    
+                    if new_posts:
+                        logger.info(f"Found {len(new_posts)} new posts for @{creator.tiktok_username}")
+                        await outbox.put((creator, new_posts))
+                    else:
+                        logger.debug(f"No new posts for @{creator.tiktok_username}")
+            except Exception as e:
+                logger.error(f"Error comparing posts of {len(batch)} creators: {e}")
+            finally:
+                for _ in batch:
+                    inbox.task_done()
+    
+    async def _persist_worker(
+        self,
+        inbox: asyncio.Queue,
+        outboxes: List[asyncio.Queue],
+        results: Dict[str, Optional[int]]
+    ):
+        """Store new posts of several creators at once."""
+        while True:
+            batch: List[Tuple[Creator, List[Post]]] = await get_batch(inbox, self.persist_batch_size)
+            try:
+                rows = [
+                    post.to_row(creator.id)
+                    for creator, posts in batch
+                    for post in posts
+                ]
+                inserted = await asyncio.to_thread(self.monitor.db.add_posts, rows)
+                inserted_ids = {row['tiktok_post_id'] for row in inserted}
+                
+                # Only send alert if post was successfully added (not duplicate)
+                threshold = self.monitor.alert_threshold()
+                for creator, posts in batch:
+                    added = 0
+                    for post in posts:
+                        if post.id not in inserted_ids:
+                            logger.warning(
+                                f"Skipped duplicate post {post.id} for @{creator.tiktok_username}"
+                            )
+                            continue
+                        
+                        added += 1
+                        self.monitor.trending.add_post(post)
+                        if self.monitor.is_recent(post, threshold):
+                            # Partition by creator to keep its alerts in order
+                            outbox = outboxes[hash(creator.id) % len(outboxes)]
+                            await outbox.put((creator, post))
+                    
+                    results[creator.tiktok_username] = added
+                    logger.info(f"Processed {added} new posts for @{creator.tiktok_username}")
+            except Exception as e:
+                logger.error(f"Error storing posts of {len(batch)} creators: {e}")
+            finally:
+                for _ in batch:
+                    inbox.task_done()
+    
+    async def _notify_worker(self, inbox: asyncio.Queue):
+        """Send alerts for stored posts."""
+        while True:
+            creator, post = await inbox.get()
+            try:
+                await self.monitor.bot.send_alerts_to_all_users(post, creator)
+            except Exception as e:
+                logger.error(f"Error sending alerts for post {post.id}: {e}")
+            finally:
+                inbox.task_done()
@@ -1,33 +1,279 @@
 """Task scheduling using asyncio instead of APScheduler."""
 import logging
 import asyncio
-from typing import Optional
+import random
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Set
 
 from config.settings import settings
+from src.models import Creator
+from src.scheduler.fair_share import FairShareScheduler
 
 logger = logging.getLogger(__name__)
 
+# Key of the scheduler checkpoint in the state store
+STATE_KEY = 'scheduler'
+
+# Due creators are checked together once per tick
+TICK_SECONDS = 60
+
+# Creators that fell due while the bot was down are spread over this window
+RESTORE_SPREAD_SECONDS = 300
+
+
+@dataclass(slots=True)
+class CreatorSchedule:
+    """When a creator is checked next and how its last checks went."""
+    
+    next_due: float
+    last_checked: Optional[float] = None
+    last_new_posts: Optional[int] = None
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'CreatorSchedule':
+        """Create from a checkpoint entry."""
+        return cls(
+            next_due=float(data['next_due']),
+            last_checked=data.get('last_checked'),
+            last_new_posts=data.get('last_new_posts'),
+        )
+
 
 class TaskScheduler:
-    """Scheduler for periodic monitoring tasks using asyncio."""
+    """
+    Scheduler for periodic monitoring tasks using asyncio.
+
+    Each creator is checked once per ``MONITOR_INTERVAL_MINUTES`` at its
+    own due time, so checks are spread over the interval instead of all
+    creators being scraped in one burst. Creators that fall due within the
+    same tick are checked as one batch. The schedule is checkpointed to
+    the state store and restored on startup. Due creators are ordered,
+    and cut to the scrape budget, fairly between the users who added them.
+    """
     
     def __init__(self, monitor):
         """Initialize scheduler with monitor instance."""
         self.monitor = monitor
         self.task: Optional[asyncio.Task] = None
+        self.priority_task: Optional[asyncio.Task] = None
+        self.priority_queue: asyncio.Queue = asyncio.Queue()
+        # Creators queued for or being seeded; periodic checks skip them
+        self.seeding: Set[str] = set()
         self.running = False
+        self.interval = settings.MONITOR_INTERVAL_MINUTES * 60
+        self.schedules: Dict[str, CreatorSchedule] = {}
+        self.restored = False
+        self.dirty = False
+        self.last_checkpoint = time.monotonic()
+        # Start of the current monitoring cycle (one interval long)
+        self.cycle_started = time.monotonic()
+        # Last time the creator list was read (None = never)
+        self.last_full_check: Optional[float] = None
+        self.fair_share = FairShareScheduler(
+            budget_per_interval=settings.SCRAPE_BUDGET_PER_INTERVAL,
+            interval_seconds=self.interval
+        )
+    
+    # ==================== State ====================
+    
+    async def restore_state(self):
+        """Restore the schedule and hashtag counts saved by a previous run."""
+        self.restored = True
+        
+        try:
+            await self.monitor.load_trending()
+        except Exception as e:
+            logger.error(f"Error loading hashtag counts: {e}")
+        
+        try:
+            saved = await asyncio.to_thread(self.monitor.db.get_state, STATE_KEY)
+        except Exception as e:
+            logger.error(f"Error loading scheduler state: {e}")
+            return
+        
+        if not saved:
+            return
+        
+        now = time.time()
+        for username, data in saved.get('creators', {}).items():
+            try:
+                schedule = CreatorSchedule.from_dict(data)
+            except (KeyError, TypeError, ValueError):
+                continue
+            
+            # Creators that fell due while the bot was down are spread
+            # over a short window instead of all being checked at once
+            if schedule.next_due < now:
+                schedule.next_due = now + random.uniform(0, min(RESTORE_SPREAD_SECONDS, self.interval))
+            self.schedules[username] = schedule
+        
+        logger.info(f"Restored schedule of {len(self.schedules)} creators")
+    
+    async def save_state(self):
+        """Checkpoint the schedule and hashtag counts to the state store."""
+        state = {
+            'saved_at': time.time(),
+            'creators': {
+                username: asdict(schedule) for username, schedule in self.schedules.items()
+            },
+        }
+        
+        try:
+            await asyncio.to_thread(self.monitor.db.set_state, STATE_KEY, state)
+            self.dirty = False
+            logger.debug(f"Saved schedule of {len(self.schedules)} creators")
+        except Exception as e:
+            logger.error(f"Error saving scheduler state: {e}")
+        
+        try:
+            await self.monitor.save_trending()
+        except Exception as e:
+            logger.error(f"Error saving hashtag counts: {e}")
+        
+        self.last_checkpoint = time.monotonic()
+    
+    # ==================== Schedule ====================
+    
+    def is_due(self, creator: Creator, now: float) -> bool:
+        """Check whether a creator should be checked now."""
+        schedule = self.schedules.get(creator.tiktok_username)
+        if schedule is None:
+            # Spread creators we have no schedule for over one interval
+            schedule = CreatorSchedule(next_due=now + random.uniform(0, self.interval))
+            self.schedules[creator.tiktok_username] = schedule
+            self.dirty = True
+        
+        return schedule.next_due <= now
+    
+    def record_check(self, username: str, new_posts: Optional[int]):
+        """
+        Record the result of a check and schedule the next one.
+
+        Args:
+            username: TikTok username
+            new_posts: Number of new posts stored (None if the fetch failed)
+        """
+        now = time.time()
+        schedule = self.schedules.get(username)
+        
+        if schedule is None:
+            schedule = CreatorSchedule(next_due=now + self.interval)
+            self.schedules[username] = schedule
+        else:
+            # Keep the creator's cadence unless it slipped a whole interval
+            schedule.next_due += self.interval
+            if schedule.next_due <= now:
+                schedule.next_due = now + self.interval
+        
+        schedule.last_checked = now
+        schedule.last_new_posts = new_posts
+        self.dirty = True
+    
+    def has_due_checks(self, now: float) -> bool:
+        """Check whether the creator list has to be read this tick."""
+        # Read it at least once per interval to pick up added and removed creators
+        if self.last_full_check is None or time.monotonic() - self.last_full_check >= self.interval:
+            return True
+        
+        # Creators left over when the budget ran out wait for the next window
+        if self.fair_share.remaining() == 0:
+            return False
+        
+        return any(schedule.next_due <= now for schedule in self.schedules.values())
+    
+    async def run_due_checks(self):
+        """Check creators that are due, within the scrape budget, and reschedule them."""
+        now = time.time()
+        if not self.has_due_checks(now):
+            return
+        
+        seen: Set[str] = set()
+        picked: Dict[str, Creator] = {}
+        
+        def select(creators: List[Creator]) -> List[Creator]:
+            seen.update(creator.tiktok_username for creator in creators)
+            # A creator being seeded would have its existing posts alerted
+            due = [
+                creator for creator in creators
+                if creator.tiktok_username not in self.seeding and self.is_due(creator, now)
+            ]
+            due.sort(key=lambda creator: self.schedules[creator.tiktok_username].next_due)
+            selected = self.fair_share.pick(due)
+            picked.update((creator.tiktok_username, creator) for creator in selected)
+            
+            if len(selected) < len(due):
+                logger.info(
+                    f"Scrape budget used up: {len(due) - len(selected)} due creators wait "
+                    f"for the next window (shares: {self.fair_share.get_stats()})"
+                )
+            return selected
+        
+        results = await self.monitor.check_all_creators(select=select)
+        self.last_full_check = time.monotonic()
+        
+        for username, new_posts in results.items():
+            self.record_check(username, new_posts)
+            self.fair_share.charge(picked[username].added_by_telegram_user)
+        
+        # Picked creators that were not checked (suspended by the circuit
+        # breaker) wait for their next turn instead of staying due
+        for username in set(picked) - set(results):
+            self.schedules[username].next_due = now + self.interval
+            self.dirty = True
+        
+        # Forget creators that are no longer tracked
+        if seen:
+            for username in set(self.schedules) - seen:
+                del self.schedules[username]
+                self.dirty = True
+    
+    # ==================== Tasks ====================
+    
+    def check_now(self, creator: Creator):
+        """Queue a newly added creator for an immediate first check."""
+        self.seeding.add(creator.tiktok_username)
+        self.priority_queue.put_nowait(creator)
+    
+    async def _priority_loop(self):
+        """Seed newly added creators as soon as they are queued."""
+        while self.running:
+            creator = await self.priority_queue.get()
+            try:
+                new_posts = await self.monitor.seed_creator(creator)
+                self.record_check(creator.tiktok_username, new_posts)
+                self.fair_share.charge(creator.added_by_telegram_user)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error seeding @{creator.tiktok_username}: {e}", exc_info=True)
+            finally:
+                self.seeding.discard(creator.tiktok_username)
         
     async def _monitoring_loop(self):
         """Background monitoring loop that runs periodically."""
         logger.info(f"Monitoring task started (interval: {settings.MONITOR_INTERVAL_MINUTES} minutes)")
         
+        if not self.restored:
+            await self.restore_state()
+        
         while self.running:
             try:
-                # Run monitoring check
-                await self.monitor.check_all_creators()
+                # Check creators whose turn has come
+                await self.run_due_checks()
+                
+                if time.monotonic() - self.cycle_started >= self.interval:
+                    self.cycle_started = time.monotonic()
+                    await self.monitor.end_cycle()
+                
+                # Checkpoint the schedule and hashtag counts
+                since_checkpoint = time.monotonic() - self.last_checkpoint
+                changed = self.dirty or self.monitor.trending.changed
+                if changed and since_checkpoint >= settings.SCHEDULER_CHECKPOINT_SECONDS:
+                    await self.save_state()
                 
-                # Wait for next interval
-                await asyncio.sleep(settings.MONITOR_INTERVAL_MINUTES * 60)
+                # Wait for the next tick
+                await asyncio.sleep(TICK_SECONDS)
                 
             except asyncio.CancelledError:
                 logger.info("Monitoring task cancelled")
@@ -46,21 +292,26 @@ class TaskScheduler:
         self.running = True
         # Create asyncio task (non-blocking)
         self.task = asyncio.create_task(self._monitoring_loop())
+        self.priority_task = asyncio.create_task(self._priority_loop())
         logger.info("Scheduler started successfully")
     
     async def stop(self):
-        """Stop the monitoring task."""
+        """Stop the monitoring task and checkpoint the schedule."""
         if not self.running:
             return
             
         logger.info("Stopping scheduler...")
         self.running = False
         
-        if self.task:
-            self.task.cancel()
-            try:
-                await self.task
-            except asyncio.CancelledError:
-                pass
+        for task in (self.task, self.priority_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        
+        if self.restored:
+            await self.save_state()
         
         logger.info("Scheduler stopped")
@@ -1,4 +1,4 @@
 """TikTok package."""
-from .scraper import TikTokScraper
+from .scraper import TikTokScraper, ScrapeError
 
-__all__ = ['TikTokScraper']
+__all__ = ['TikTokScraper', 'ScrapeError']
@@ -0,0 +1,165 @@
+"""Per-creator circuit breaker for failing TikTok accounts."""
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+
+class CreatorHealth:
+    """Scrape health of a single creator."""
+    
+    __slots__ = ('username', 'state', 'failure_count', 'trip_count', 'open_until', 'last_error')
+    
+    def __init__(
+        self,
+        username: str,
+        state: str = STATE_CLOSED,
+        failure_count: int = 0,
+        trip_count: int = 0,
+        open_until: float = 0.0,
+        last_error: Optional[str] = None
+    ):
+        """Initialize creator health."""
+        self.username = username
+        self.state = state
+        self.failure_count = failure_count
+        self.trip_count = trip_count
+        self.open_until = open_until
+        self.last_error = last_error
+    
+    def to_row(self) -> Dict[str, Any]:
+        """Convert to a ``creator_health`` database row."""
+        return {
+            'tiktok_username': self.username,
+            'state': self.state,
+            'failure_count': self.failure_count,
+            'trip_count': self.trip_count,
+            'open_until': (
+                datetime.fromtimestamp(self.open_until, tz=timezone.utc).isoformat()
+                if self.open_until else None
+            ),
+            'last_error': self.last_error,
+        }
+    
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> 'CreatorHealth':
+        """Create from a ``creator_health`` database row."""
+        open_until = row.get('open_until')
+        if isinstance(open_until, str):
+            open_until = datetime.fromisoformat(open_until).timestamp()
+        elif isinstance(open_until, datetime):
+            open_until = open_until.timestamp()
+        
+        return cls(
+            username=row['tiktok_username'],
+            state=row.get('state') or STATE_CLOSED,
+            failure_count=row.get('failure_count') or 0,
+            trip_count=row.get('trip_count') or 0,
+            open_until=open_until or 0.0,
+            last_error=row.get('last_error'),
+        )
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker with exponential backoff, one circuit per creator.
+
+    A creator's circuit opens after ``failure_threshold`` consecutive failed
+    scrapes and stays open for a backoff that doubles each time it trips
+    again (capped at ``max_backoff_seconds``). When the backoff expires the
+    circuit is half-open: one probe scrape is allowed, which closes the
+    circuit on success or re-opens it on failure.
+    """
+    
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        base_backoff_seconds: float = 1800,
+        max_backoff_seconds: float = 86400
+    ):
+        """Initialize circuit breaker."""
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff_seconds
+        self.max_backoff = max_backoff_seconds
+        self._creators: Dict[str, CreatorHealth] = {}
+    
+    def load(self, rows: List[Dict[str, Any]]):
+        """Restore creator health from database rows."""
+        for row in rows:
+            health = CreatorHealth.from_row(row)
+            self._creators[health.username] = health
+        logger.info(f"Loaded circuit breaker state for {len(rows)} creators")
+    
+    def get(self, username: str) -> CreatorHealth:
+        """Get a creator's health, creating a closed circuit if unknown."""
+        health = self._creators.get(username)
+        if health is None:
+            health = self._creators[username] = CreatorHealth(username)
+        return health
+    
+    def allow(self, username: str) -> bool:
+        """Check whether a creator may be scraped now."""
+        health = self._creators.get(username)
+        if health is None or health.state == STATE_CLOSED:
+            return True
+        
+        if health.state == STATE_OPEN and time.time() >= health.open_until:
+            health.state = STATE_HALF_OPEN
+            logger.info(f"Circuit half-open for @{username}, probing")
+        
+        return health.state == STATE_HALF_OPEN
+    
+    def record_success(self, username: str) -> bool:
+        """
+        Record a successful scrape.
+
+        Returns:
+            True if the creator's health changed and should be persisted
+        """
+        health = self._creators.get(username)
+        if health is None or (health.state == STATE_CLOSED and not health.failure_count):
+            return False
+        
+        if health.state != STATE_CLOSED:
+            logger.info(f"Circuit closed for @{username}")
+        
+        health.state = STATE_CLOSED
+        health.failure_count = 0
+        health.trip_count = 0
+        health.open_until = 0.0
+        health.last_error = None
+        return True
+    
+    def record_failure(self, username: str, error: str) -> bool:
+        """
+        Record a failed scrape.
+
+        Returns:
+            True if this failure opened a previously closed circuit
+        """
+        health = self.get(username)
+        health.failure_count += 1
+        health.last_error = error[:500]
+        
+        was_closed = health.state == STATE_CLOSED
+        if health.state == STATE_HALF_OPEN or health.failure_count >= self.failure_threshold:
+            health.trip_count += 1
+            backoff = min(
+                self.base_backoff * 2 ** (health.trip_count - 1),
+                self.max_backoff
+            )
+            health.state = STATE_OPEN
+            health.open_until = time.time() + backoff
+            logger.warning(
+                f"Circuit open for @{username} for {backoff / 60:.0f} minutes "
+                f"after {health.failure_count} failures: {health.last_error}"
+            )
+            return was_closed
+        
+        return False
@@ -1,22 +1,54 @@
-"""TikTok scraper using TikTokApi and yt-dlp as fallback."""
+"""TikTok scraper using yt-dlp."""
+import asyncio
 import logging
+import random
 import re
+import threading
 import time
-from typing import List, Dict, Optional, Any
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Deque, Dict, List, Optional, Set
 from datetime import datetime
-import yt_dlp
-
-try:
-    from TikTokApi import TikTokApi
-    TIKTOK_API_AVAILABLE = True
-except ImportError:
-    TIKTOK_API_AVAILABLE = False
-    logging.warning("TikTokApi not available, will use yt-dlp only")
 
 from config.settings import settings
+from src.models import Post
+from src.tiktok.proxy_pool import Proxy, ProxyPool, classify_error
 
 logger = logging.getLogger(__name__)
 
+# Longest wait between two attempts of a fetch, in seconds
+MAX_BACKOFF_SECONDS = 60
+
+# Latencies of recent successful fetches kept for the hedging threshold
+LATENCY_SAMPLES = 100
+
+# Samples needed before fetches are hedged
+MIN_LATENCY_SAMPLES = 20
+
+
+class ScrapeError(Exception):
+    """Raised when a creator's videos could not be fetched."""
+
+
+# yt-dlp is imported on first use (or by warm_up) to keep startup fast
+_yt_dlp = None
+_yt_dlp_lock = threading.Lock()
+
+
+def load_yt_dlp():
+    """Import yt-dlp once and return the module."""
+    global _yt_dlp
+    
+    if _yt_dlp is None:
+        with _yt_dlp_lock:
+            if _yt_dlp is None:
+                start = time.perf_counter()
+                import yt_dlp
+                _yt_dlp = yt_dlp
+                logger.info(f"Loaded yt-dlp in {time.perf_counter() - start:.2f}s")
+    
+    return _yt_dlp
+
 
 class TikTokScraper:
     """Scraper for TikTok user videos and hashtags."""
@@ -24,10 +56,39 @@ class TikTokScraper:
     def __init__(self):
         """Initialize TikTok scraper."""
         self.api = None
+        self.proxy_pool = None
+        # Latencies of recent successful fetches, for hedging
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        # yt-dlp gets its own bounded thread pool, so stuck extractions never
+        # take the default executor threads the database calls run on
+        max_extractions = max(settings.TIKTOK_MAX_EXTRACTIONS, 1)
+        self.executor = ThreadPoolExecutor(max_workers=max_extractions, thread_name_prefix='yt-dlp')
+        # Free extraction threads: taken before a fetch starts and given back
+        # when its thread really ends, so abandoned fetches keep their slot
+        self.extraction_slots = asyncio.Semaphore(max_extractions)
+        # Extractions past their deadline whose threads are still running
+        self.abandoned: Set[Future] = set()
+        if settings.TIKTOK_PROXIES:
+            self.proxy_pool = ProxyPool(
+                settings.TIKTOK_PROXIES,
+                max_requests_per_minute=settings.PROXY_MAX_REQUESTS_PER_MINUTE,
+                quarantine_seconds=settings.PROXY_QUARANTINE_SECONDS
+            )
         # Skip TikTokApi initialization - it requires Playwright browser setup
         # which is complex and often breaks. We'll rely on yt-dlp primarily.
         logger.info("TikTok scraper initialized (using yt-dlp)")
     
+    def close(self):
+        """Stop the extraction pool without waiting for running extractions."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+    
+    async def warm_up(self):
+        """Load the scraping backend in a worker thread."""
+        try:
+            await asyncio.to_thread(load_yt_dlp)
+        except Exception as e:
+            logger.error(f"Error loading yt-dlp: {e}")
+    
     def extract_hashtags(self, text: str) -> List[str]:
         """Extract hashtags from text."""
         if not text:
@@ -40,18 +101,33 @@ class TikTokScraper:
     def get_user_videos_with_ytdlp(
         self,
         username: str,
-        count: int = 5
-    ) -> List[Dict[str, Any]]:
-        """Get user videos using yt-dlp."""
+        count: int = 5,
+        proxy: Optional[str] = None
+    ) -> List[Post]:
+        """
+        Get user videos using yt-dlp.
+        
+        Args:
+            username: TikTok username (without @)
+            count: Number of recent videos to fetch
+            proxy: Proxy URL to send the requests through
+        
+        Raises:
+            ScrapeError: If the account could not be fetched (deleted,
+                private, banned or blocked)
+        """
         try:
             user_url = f"https://www.tiktok.com/@{username}"
             
             ydl_opts = {
-                'quiet': False,
+                'quiet': True,
                 'no_warnings': False,
+                # Route yt-dlp output through the (non-blocking) logging pipeline
+                'logger': logging.getLogger('yt_dlp'),
                 'extract_flat': 'in_playlist',
                 'skip_download': True,
-                'ignoreerrors': True,
+                # Raise extraction errors so failing accounts can be detected
+                'ignoreerrors': 'only_download',
                 'playlist_items': f'1-{count}',  # Only fetch first N items
                 'extractor_args': {
                     'tiktok': {
@@ -60,15 +136,23 @@ class TikTokScraper:
                 },
             }
             
+            if proxy:
+                ydl_opts['proxy'] = proxy
+            if settings.TIKTOK_REQUEST_TIMEOUT > 0:
+                # Bound every socket read, so a fetch abandoned at its
+                # deadline also ends its worker thread soon after
+                ydl_opts['socket_timeout'] = settings.TIKTOK_REQUEST_TIMEOUT
+            
             videos = []
             
+            yt_dlp = load_yt_dlp()
+            
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                 logger.info(f"Fetching videos for @{username}...")
                 info = ydl.extract_info(user_url, download=False)
                 
                 if not info:
-                    logger.warning(f"No info returned for @{username}")
-                    return []
+                    raise ScrapeError(f"No info returned for @{username}")
                 
                 # Check if we got entries (playlist of videos)
                 entries = info.get('entries', [])
@@ -98,15 +182,14 @@ class TikTokScraper:
                         timestamp = entry.get('timestamp')
                         created_at = datetime.fromtimestamp(timestamp) if timestamp else None
                         
-                        post_info = {
-                            'id': video_id,
-                            'description': description,
-                            'url': video_url,
-                            'created_at': created_at,
-                            'hashtags': self.extract_hashtags(description),
-                            'author': username
-                        }
-                        videos.append(post_info)
+                        videos.append(Post(
+                            id=video_id,
+                            url=video_url,
+                            author=username,
+                            description=description,
+                            hashtags=self.extract_hashtags(description),
+                            created_at=created_at
+                        ))
                         processed += 1
                         
                         logger.debug(f"Processed video {video_id} for @{username}")
@@ -118,55 +201,219 @@ class TikTokScraper:
             logger.info(f"Fetched {len(videos)} videos for @{username} using yt-dlp")
             return videos
             
+        except ScrapeError as e:
+            logger.error(f"Error fetching videos with yt-dlp for @{username}: {e}")
+            raise
         except Exception as e:
             logger.error(f"Error fetching videos with yt-dlp for @{username}: {e}")
-            return []
+            raise ScrapeError(str(e)) from e
     
     async def get_user_videos(
         self,
         username: str,
         count: int = 5
-    ) -> List[Dict[str, Any]]:
+    ) -> List[Post]:
         """
         Get user videos using yt-dlp.
         
+        Every attempt has a deadline of ``TIKTOK_REQUEST_TIMEOUT`` seconds.
+        Network errors, timeouts and challenge pages are retried up to
+        ``TIKTOK_MAX_RETRIES`` times with jittered exponential backoff
+        starting at ``TIKTOK_REQUEST_DELAY``; account errors are not.
+        
         Args:
             username: TikTok username (without @)
             count: Number of recent videos to fetch
             
         Returns:
-            List of video information dictionaries
+            List of posts
+            
+        Raises:
+            ScrapeError: If the account could not be fetched
         """
         # Remove @ if present
         username = username.lstrip('@')
         
-        # Use yt-dlp directly (TikTokApi requires complex Playwright setup)
-        return self.get_user_videos_with_ytdlp(username, count)
+        retries = max(settings.TIKTOK_MAX_RETRIES, 0)
+        for attempt in range(retries + 1):
+            try:
+                return await self._fetch_hedged(username, count)
+            except ScrapeError as e:
+                if attempt >= retries or classify_error(str(e)) == 'account':
+                    raise
+        
+                delay = min(settings.TIKTOK_REQUEST_DELAY * 2 ** attempt, MAX_BACKOFF_SECONDS)
+                delay = random.uniform(delay / 2, delay)
+                logger.warning(
+                    f"Retrying @{username} in {delay:.1f}s "
+                    f"(attempt {attempt + 2}/{retries + 1}): {e}"
+                )
+                await asyncio.sleep(delay)
+    
+    def latency_p95(self) -> Optional[float]:
+        """95th percentile of recent fetch latencies (None until enough samples)."""
+        if len(self.latencies) < MIN_LATENCY_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[int(len(ordered) * 0.95) - 1]
+    
+    async def _fetch_hedged(self, username: str, count: int) -> List[Post]:
+        """
+        Fetch once, sending a second request if the first is slower than p95.
+        
+        The first request to succeed wins and the other one is cancelled.
+        Without ``TIKTOK_HEDGE_REQUESTS`` (or enough latency samples) this
+        is a single fetch.
+        """
+        threshold = self.latency_p95() if settings.TIKTOK_HEDGE_REQUESTS else None
+        if threshold is None:
+            return await self._fetch_once(username, count)
+        
+        first = asyncio.create_task(self._fetch_once(username, count))
+        pending = {first}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=threshold)
+            if done:
+                return first.result()
+            
+            logger.info(f"Hedging fetch of @{username} after {threshold:.1f}s")
+            pending.add(asyncio.create_task(self._fetch_once(username, count)))
+            
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    # The other request would fail on the same account
+                    if classify_error(str(task.exception())) == 'account':
+                        raise task.exception()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def _fetch_once(self, username: str, count: int) -> List[Post]:
+        """
+        Fetch videos on an extraction thread, through a proxy if there is a pool.
+        
+        A thread cannot be killed, so a fetch past its deadline is
+        abandoned: the caller gets a timeout error right away and the
+        thread keeps its slot until its next socket timeout ends it. When
+        every slot is taken, new fetches wait for one before starting.
+        """
+        await self.extraction_slots.acquire()
+        future = None
+        try:
+            proxy = None
+            if self.proxy_pool:
+                # Wait for a proxy that is neither quarantined nor rate limited
+                proxy = self.proxy_pool.acquire()
+                while proxy is None:
+                    await asyncio.sleep(max(self.proxy_pool.wait_time(), 0.1))
+                    proxy = self.proxy_pool.acquire()
+            
+            loop = asyncio.get_running_loop()
+            timeout = settings.TIKTOK_REQUEST_TIMEOUT or None
+            start = time.perf_counter()
+            future = self.executor.submit(
+                self.get_user_videos_with_ytdlp, username, count, proxy.url if proxy else None
+            )
+            future.add_done_callback(lambda done: self._call_on_loop(loop, self._extraction_done, done))
+            try:
+                videos = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+            except asyncio.TimeoutError:
+                if not future.done():
+                    self.abandoned.add(future)
+                logger.warning(
+                    f"Fetch of @{username} timed out after {timeout}s "
+                    f"({len(self.abandoned)} abandoned extractions still running)"
+                )
+                if proxy:
+                    self.proxy_pool.report_failure(proxy, challenge=False)
+                raise ScrapeError(f"Timed out after {timeout}s") from None
+            except asyncio.CancelledError:
+                # E.g. a hedge that lost the race: report its proxy once the thread ends
+                if not future.done():
+                    self.abandoned.add(future)
+                if proxy:
+                    def report_late(done: Future):
+                        if not done.cancelled():
+                            self._report_proxy(proxy, time.perf_counter() - start, done.exception())
+                    future.add_done_callback(report_late)
+                raise
+            except ScrapeError as e:
+                if proxy:
+                    self._report_proxy(proxy, time.perf_counter() - start, e)
+                raise
+        finally:
+            if future is None:
+                self.extraction_slots.release()
+        
+        elapsed = time.perf_counter() - start
+        self.latencies.append(elapsed)
+        if proxy:
+            self._report_proxy(proxy, elapsed, None)
+        return videos
+    
+    def _report_proxy(self, proxy: Proxy, elapsed: float, error: Optional[BaseException]):
+        """Record the outcome of a request in the proxy pool (thread-safe)."""
+        kind = classify_error(str(error)) if error is not None else None
+        if kind is None or kind == 'account':
+            # On account errors the proxy worked; the account itself is the problem
+            self.proxy_pool.report_success(proxy, elapsed)
+        else:
+            self.proxy_pool.report_failure(proxy, challenge=kind == 'challenge')
     
-    async def check_new_posts(
+    @staticmethod
+    def _call_on_loop(loop: asyncio.AbstractEventLoop, callback, *args):
+        """Run a callback on the event loop from an extraction thread."""
+        try:
+            loop.call_soon_threadsafe(callback, *args)
+        except RuntimeError:
+            pass  # The loop is closed (shutting down)
+    
+    def _extraction_done(self, future: Future):
+        """Give an extraction slot back once its thread has ended."""
+        self.abandoned.discard(future)
+        self.extraction_slots.release()
+    
+    async def check_accounts(
         self,
-        username: str,
-        existing_post_ids: List[str],
-        count: int = 5
-    ) -> List[Dict[str, Any]]:
+        usernames: List[str],
+        count: int = 5,
+        concurrency: int = 4
+    ) -> Dict[str, Optional[List[Post]]]:
         """
-        Check for new posts that aren't in the existing post IDs.
+        Fetch several accounts concurrently to check that they exist.
+        
+        At most ``concurrency`` accounts are fetched at a time, and each
+        slot waits ``TIKTOK_REQUEST_DELAY`` seconds before it is reused;
+        proxies also keep their own rate limits.
         
         Args:
-            username: TikTok username
-            existing_post_ids: List of post IDs already seen
-            count: Number of recent videos to check
+            usernames: TikTok usernames
+            count: Number of recent videos to fetch per account
+            concurrency: Max accounts fetched at the same time
             
         Returns:
-            List of new posts
+            Recent posts per username (None if the account could not be fetched)
         """
-        videos = await self.get_user_videos(username, count)
+        semaphore = asyncio.Semaphore(max(1, concurrency))
         
-        # Filter out posts we've already seen
-        new_posts = [
-            video for video in videos
-            if video['id'] and video['id'] not in existing_post_ids
-        ]
+        async def check(username: str) -> Optional[List[Post]]:
+            async with semaphore:
+                try:
+                    return await self.get_user_videos(username, count)
+                except ScrapeError:
+                    return None
+                finally:
+                    await asyncio.sleep(settings.TIKTOK_REQUEST_DELAY)
         
-        logger.info(f"Found {len(new_posts)} new posts for @{username}")
-        return new_posts
+        results = await asyncio.gather(*(check(username) for username in usernames))
+        return dict(zip(usernames, results))
+    
+    def get_proxy_stats(self) -> List[Dict[str, Any]]:
+        """Get per-proxy success and latency statistics (empty without a pool)."""
+        return self.proxy_pool.get_stats() if self.proxy_pool else []
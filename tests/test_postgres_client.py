@@ -0,0 +1,111 @@
+"""Postgres backend tests against a real database (set TEST_DATABASE_URL)."""
+import asyncio
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+TEST_DATABASE_URL = os.getenv('TEST_DATABASE_URL', '')
+
+if not TEST_DATABASE_URL:
+    pytest.skip('TEST_DATABASE_URL is not set', allow_module_level=True)
+
+asyncpg = pytest.importorskip('asyncpg')
+
+from src.database.postgres_client import PostgresClient  # noqa: E402
+
+SCHEMA_SQL = (Path(__file__).parent.parent / 'src' / 'database' / 'schema.sql').read_text()
+
+
+async def execute(*statements: str):
+    """Run statements on one connection to the test database."""
+    conn = await asyncpg.connect(TEST_DATABASE_URL)
+    try:
+        for statement in statements:
+            await conn.execute(statement)
+    finally:
+        await conn.close()
+
+
+@pytest.fixture(scope='module')
+def dsn():
+    """Load schema.sql into a throwaway schema and point the DSN at it."""
+    schema = f'test_{uuid.uuid4().hex[:12]}'
+    asyncio.run(execute(f'CREATE SCHEMA {schema}', f'SET search_path TO {schema}', SCHEMA_SQL))
+    # asyncpg sends unknown DSN parameters as session settings
+    separator = '&' if '?' in TEST_DATABASE_URL else '?'
+    yield f'{TEST_DATABASE_URL}{separator}search_path={schema}'
+    asyncio.run(execute(f'DROP SCHEMA {schema} CASCADE'))
+
+
+@pytest.fixture
+def db(dsn):
+    client = PostgresClient(dsn, min_size=1, max_size=2)
+    yield client
+    client.close()
+
+
+def make_posts(creator_id, post_ids):
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            'creator_id': creator_id,
+            'tiktok_post_id': post_id,
+            'post_url': f'https://www.tiktok.com/@alice/video/{post_id}',
+            'description': f'dance video {post_id}',
+            'hashtags': ['fyp', 'dance'],
+            'created_at': now,
+        }
+        for post_id in post_ids
+    ]
+
+
+def test_add_posts_skips_existing(db):
+    creator = db.add_tracked_creator('alice', 1)
+    
+    first = db.add_posts(make_posts(creator['id'], ['1', '2', '3']))
+    assert sorted(row['tiktok_post_id'] for row in first) == ['1', '2', '3']
+    
+    # The staging table is emptied on commit, so old rows are not copied again
+    second = db.add_posts(make_posts(creator['id'], ['2', '3', '4', '4']))
+    assert [row['tiktok_post_id'] for row in second] == ['4']
+    
+    assert len(db.get_creator_posts(creator['id'], limit=10)) == 4
+    assert [row['tiktok_post_id'] for row in db.search_posts(1, 'dance 4')] == ['4']
+
+
+def test_upsert_rows(db):
+    db.upsert_rows('bot_users', [{'telegram_user_id': 2, 'username': 'old', 'is_active': True}])
+    db.upsert_rows('bot_users', [{'telegram_user_id': 2, 'username': 'new', 'is_active': True}])
+    assert db.get_bot_user(2)['username'] == 'new'
+    
+    # Posts are never overwritten
+    creator = db.add_tracked_creator('bob', 2)
+    row = dict(make_posts(creator['id'], ['b1'])[0], id=str(uuid.uuid4()))
+    db.upsert_rows('posts', [row])
+    db.upsert_rows('posts', [dict(row, description='changed')])
+    assert db.get_creator_posts(creator['id'])[0]['description'] == 'dance video b1'
+
+
+def test_calls_from_many_threads(db):
+    def round_trip(n):
+        db.set_state(f'key-{n}', {'n': n})
+        return db.get_state(f'key-{n}')
+    
+    # More callers than pooled connections, all through the client's own loop
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(round_trip, range(32)))
+    
+    assert results == [{'n': n} for n in range(32)]
+
+
+def test_close_stops_loop(dsn):
+    client = PostgresClient(dsn, min_size=1, max_size=2)
+    client.ping()
+    client.close()
+    
+    assert not client._thread.is_alive()
+    assert client.pool._closed
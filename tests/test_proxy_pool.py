@@ -0,0 +1,111 @@
+"""Proxy pool tests against local stub proxies."""
+import asyncio
+import random
+import threading
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from config.settings import settings
+from src.models import Post
+from src.tiktok.proxy_pool import ProxyPool, classify_error
+from src.tiktok.scraper import ScrapeError, TikTokScraper
+
+
+def start_stub_proxy(status: int):
+    """Start a local HTTP proxy answering every request with ``status``."""
+    seen = []
+    
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            # Proxied requests carry the absolute URL as their path
+            seen.append(self.path)
+            body = b'{"ok": true}' if status == 200 else b'Too Many Requests'
+            self.send_response(status)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, *args):
+            pass
+    
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}', seen
+
+
+def fetch_through_proxy(self, username, count=5, proxy=None):
+    """Stand-in for the yt-dlp extraction that sends one request through ``proxy``."""
+    opener = urllib.request.build_opener(urllib.request.ProxyHandler({'http': proxy}))
+    try:
+        opener.open(f'http://www.tiktok.com/@{username}', timeout=5).read()
+    except urllib.error.HTTPError as e:
+        # Same message shape as yt-dlp download errors
+        raise ScrapeError(f'Unable to download webpage: HTTP Error {e.code}: {e.reason}')
+    return [Post(id='1', url=f'https://www.tiktok.com/@{username}/video/1', author=username)]
+
+
+@pytest.fixture
+def stub_proxies(monkeypatch):
+    good, good_url, good_seen = start_stub_proxy(200)
+    blocked, blocked_url, blocked_seen = start_stub_proxy(429)
+    monkeypatch.setattr(settings, 'TIKTOK_PROXIES', [good_url, blocked_url])
+    monkeypatch.setattr(settings, 'PROXY_MAX_REQUESTS_PER_MINUTE', 0)
+    monkeypatch.setattr(settings, 'TIKTOK_MAX_RETRIES', 0)
+    monkeypatch.setattr(settings, 'TIKTOK_HEDGE_REQUESTS', False)
+    monkeypatch.setattr(TikTokScraper, 'get_user_videos_with_ytdlp', fetch_through_proxy)
+    yield good_url, good_seen, blocked_url, blocked_seen
+    good.shutdown()
+    blocked.shutdown()
+
+
+def test_classify_error():
+    assert classify_error('HTTP Error 404: Not Found') == 'account'
+    assert classify_error("This user's account is private") == 'account'
+    assert classify_error('Unable to download webpage: HTTP Error 429: Too Many Requests') == 'challenge'
+    assert classify_error('ProxyError: Unable to connect to proxy') == 'network'
+    # Unknown errors are retried and never count against the creator
+    assert classify_error('Unable to extract universal data for rehydration') == 'network'
+    assert classify_error('HTTP Error 500: Internal Server Error') == 'network'
+
+
+def test_challenged_proxy_is_quarantined(stub_proxies):
+    good_url, good_seen, blocked_url, blocked_seen = stub_proxies
+    random.seed(1)
+    scraper = TikTokScraper()
+    
+    async def fetch_many():
+        results = []
+        for _ in range(20):
+            try:
+                results.append(await scraper.get_user_videos('alice'))
+            except ScrapeError:
+                results.append(None)
+        return results
+    
+    try:
+        results = asyncio.run(fetch_many())
+    finally:
+        scraper.close()
+    
+    # The blocked proxy fails once, is quarantined and never picked again
+    assert len(blocked_seen) == 1
+    assert results.count(None) == 1
+    assert len(good_seen) == 19
+    
+    stats = {stat['proxy']: stat for stat in scraper.get_proxy_stats()}
+    blocked, good = stats[blocked_url], stats[good_url]
+    assert blocked['quarantined'] and blocked['challenges'] == 1
+    assert good['successes'] == 19 and good['failures'] == 0
+    assert good['avg_latency_ms'] >= 0
+
+
+def test_rate_limit_per_proxy():
+    pool = ProxyPool(['http://127.0.0.1:1'], max_requests_per_minute=2)
+    proxy = pool.acquire()
+    assert proxy is not None
+    # 2 requests per minute: the next one is allowed 30 seconds later
+    assert pool.acquire() is None
+    assert 29 < pool.wait_time() <= 30